@@ -6,6 +6,7 @@ class Settings(BaseSettings):
     api_title: str = "CV Matching RAG API"
     api_version: str = "1.0.0"
     debug: bool = True
+    warmup_on_startup: bool = True  # load models and connect stores before reporting ready
     
     # Server Configuration
     backend_url: str = "http://localhost:8801"
@@ -28,6 +29,44 @@ class Settings(BaseSettings):
     pinecone_environment: str = "us-east-1-aws"
     pinecone_index_name: str = "cv-matching-index"
     
+    # Vector Store Configuration
+    vector_store_backend: str = "pinecone"  # pinecone, local
+    local_index_path: Optional[str] = "./data/vector_index"  # None keeps the index in memory
+    local_index_hnsw_threshold: int = 50000  # exact search below this many vectors
+    local_index_hnsw_m: int = 16
+    local_index_hnsw_ef_construction: int = 200
+    local_index_hnsw_ef_search: int = 64
+    local_index_precision: str = "float32"  # float32, float16, int8 codes for the coarse search
+    local_index_pca_dim: int = 0  # project coarse codes to this many dimensions, 0 = off
+    local_index_pca_min_vectors: int = 1000  # vectors needed before PCA is fitted
+    local_index_rerank_factor: int = 4  # coarse shortlist of top_k * factor, reranked at full precision
+    local_index_graph_snapshot_every: int = 1000  # HNSW inserts between graph snapshots
+    local_index_compact_min_dead: int = 1024  # tombstoned slots before compaction is considered
+    local_index_compact_ratio: float = 0.25  # compact once this fraction of slots is tombstoned
+    
+    # Document Store Configuration
+    document_store_path: str = "./data/documents.db"  # full CV text and metadata
+    
+    # Lexical Index Configuration (hybrid retrieval with JDRequest.required_skills)
+    lexical_index_path: str = "./data/lexical_index.db"  # BM25 keyword index over CV text
+    rrf_k: int = 60  # reciprocal rank fusion constant for vector + BM25 rankings
+    skill_filter_min_fraction: float = 0.0  # opt-in: CVs matching fewer required skills only get leftover top-M slots
+    
+    # Incremental Matching Configuration
+    incremental_matching: bool = True  # reuse saved results for unchanged CVs on re-runs
+    match_run_store_path: str = "./data/match_runs.db"
+    
+    # Bulk Ingestion Configuration
+    bulk_embed_batch_size: int = 32  # CVs embedded per model call
+    bulk_upsert_chunk_size: int = 100  # vectors per vector-store upsert
+    bulk_max_file_bytes: int = 20 * 1024 * 1024  # per uploaded file or archive member
+    bulk_max_archive_members: int = 2000  # files read from one zip/tar archive
+    
+    # Document Parsing Configuration
+    parser_workers: int = 2  # processes for PDF/DOCX/PPTX text extraction
+    parser_timeout: float = 30.0  # seconds per file
+    parser_cache_size: int = 1000  # parsed texts cached by file hash
+    
     # Langfuse Configuration
     langfuse_public_key: Optional[str] = None
     langfuse_secret_key: Optional[str] = None
@@ -36,11 +75,69 @@ class Settings(BaseSettings):
     # Embedding Configuration
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
     embedding_dimension: int = 384
+    embedding_backend: str = "torch"  # torch, onnx (exported, int8-quantized by default)
+    embedding_torch_threads: int = 0  # 0 keeps torch's default
+    embedding_onnx_path: str = "./data/onnx"  # exported models, one directory per model
+    embedding_onnx_quantize: bool = True
+    embedding_onnx_threads: int = 0  # onnxruntime intra-op threads, 0 lets it decide
+    embedding_parity_min_cosine: float = 0.98  # onnx vs torch, checked by embedding_backends check
+    embedding_cache_enabled: bool = True
+    embedding_cache_size: int = 10000  # entries in the in-memory LRU tier
+    embedding_cache_path: Optional[str] = "./data/embedding_cache.db"  # None disables the disk tier
+    embedding_batching_enabled: bool = True
+    embedding_batch_max_size: int = 32
+    embedding_batch_wait_ms: float = 5.0  # how long a batch waits for more requests
     
     # RAG Configuration
     max_cv_results: int = 10
-    similarity_threshold: float = 0.5
-    llm_provider: str = "openai"  # openai, claude, grok
+    similarity_threshold: float = 0.5  # CVs below this vector similarity skip LLM scoring
+    llm_top_m: int = 20  # at most this many CVs per request are scored by the LLM
+    cv_token_budget: int = 1500  # estimated tokens of CV text sent to the LLM
+    cv_chunk_tokens: int = 250  # max size of a CV chunk ranked against the JD
+    llm_provider: str = "openai"  # openai, claude, grok, auto (latency-aware routing)
+    llm_max_retries: int = 2
+    llm_request_timeout: float = 60.0  # seconds per LLM HTTP request
+    match_concurrency: int = 8  # per-CV pipelines run in parallel per request
+    cv_pipeline_timeout: float = 120.0  # seconds before a single CV is abandoned
+    
+    # LLM Response Cache Configuration
+    llm_cache_enabled: bool = True
+    llm_cache_path: str = "./data/llm_cache.db"
+    llm_cache_ttl_seconds: float = 7 * 24 * 3600
+    llm_cache_max_entries: int = 50000
+    
+    # LLM Provider Routing Configuration (llm_provider="auto")
+    llm_router_providers: str = "openai,claude,grok"  # providers the router may use
+    llm_router_window: int = 50  # recent calls kept per provider
+    llm_router_ewma_alpha: float = 0.2
+    llm_router_max_error_rate: float = 0.5  # over the window, before cooling down
+    llm_router_max_consecutive_errors: int = 3
+    llm_router_error_cooldown: float = 30.0  # seconds a failing provider is skipped
+    llm_router_rate_limit_cooldown: float = 60.0  # seconds a rate-limited provider is skipped
+    llm_hedging_enabled: bool = False  # race a second provider on slow calls
+    llm_hedge_delay_ms: float = 2000.0  # minimum wait before hedging
+    
+    # Observability Export Configuration
+    observability_queue_size: int = 10000  # events beyond this are dropped
+    observability_batch_size: int = 100
+    observability_flush_interval: float = 2.0  # seconds between export polls
+    observability_sample_cv_matching: float = 1.0  # fraction of events exported
+    observability_sample_embedding: float = 0.1
+    observability_sample_llm_call: float = 1.0
+    
+    # Batched LLM Scoring Configuration
+    llm_batch_scoring: bool = False  # score several CVs per LLM call
+    llm_batch_max_cvs: int = 8
+    llm_batch_token_budget: int = 12000  # estimated prompt tokens per batch
+    
+    # Single-Flight Configuration
+    single_flight_enabled: bool = True  # concurrent identical embeddings and LLM scorings run once
+    
+    # Matching Job Queue Configuration
+    match_job_store_path: str = "./data/match_jobs.db"  # job status and results, survives restarts
+    match_job_workers: int = 2  # jobs run concurrently
+    match_job_poll_interval: float = 5.0  # seconds between store polls when idle
+    match_job_page_size: int = 50  # default results per page
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,136 @@
+import logging
+import re
+from typing import List, Optional, Tuple
+
+import numpy as np
+from app.core.prompts import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Heading keywords recognised as the start of a CV section
+SECTION_KEYWORDS = {
+    "summary": ["summary", "profile", "about me", "objective", "overview"],
+    "experience": ["experience", "employment", "work history", "career", "professional background"],
+    "skills": ["skills", "technologies", "technical skills", "competencies", "tools", "tech stack"],
+    "education": ["education", "academic", "qualifications", "degrees"],
+    "projects": ["projects", "portfolio"],
+    "certifications": ["certifications", "certificates", "licenses", "courses", "training"],
+    "publications": ["publications", "patents"],
+    "languages": ["languages"],
+    "awards": ["awards", "honors", "honours", "achievements"]
+}
+
+_HEADING_CLEAN = re.compile(r"[#*_:=\-|•\s]+")
+
+
+def _section_for_heading(line: str) -> Optional[str]:
+    """Return the section name if the line looks like a section heading"""
+    cleaned = _HEADING_CLEAN.sub(" ", line).strip().lower()
+    if not cleaned or len(cleaned) > 40:
+        return None
+    for section, keywords in SECTION_KEYWORDS.items():
+        if any(cleaned == kw or cleaned.startswith(kw + " ") or cleaned.endswith(" " + kw)
+               for kw in keywords):
+            return section
+    return None
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """Split a CV into (section name, body) pairs in document order"""
+    sections: List[Tuple[str, List[str]]] = [("header", [])]
+    for line in text.splitlines():
+        section = _section_for_heading(line)
+        if section:
+            sections.append((section, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [
+        (name, "\n".join(lines).strip())
+        for name, lines in sections
+        if "\n".join(lines).strip()
+    ]
+
+
+def _chunk(body: str, max_tokens: int) -> List[str]:
+    """Split a section body into chunks of at most max_tokens (estimated)"""
+    if estimate_tokens(body) <= max_tokens:
+        return [body]
+    max_chars = max_tokens * 4
+    pieces: List[str] = []
+    for paragraph in re.split(r"\n\s*\n", body):
+        lines = paragraph.splitlines() or [paragraph]
+        for line in lines:
+            # Very wide lines are hard-split so they can't blow the budget
+            while len(line) > max_chars:
+                cut = line.rfind(" ", 0, max_chars)
+                cut = cut if cut > 0 else max_chars
+                pieces.append(line[:cut])
+                line = line[cut:].lstrip()
+            pieces.append(line)
+        pieces.append("")
+
+    chunks, current = [], ""
+    for piece in pieces:
+        candidate = f"{current}\n{piece}" if current else piece
+        if current and len(candidate) > max_chars:
+            chunks.append(current.strip())
+            current = piece
+        else:
+            current = candidate
+    if current.strip():
+        chunks.append(current.strip())
+    return [chunk for chunk in chunks if chunk]
+
+
+class CVCondenser:
+    """Condenses a CV to a token budget, keeping the sections most similar to the JD.
+
+    The CV is split into sections (experience, skills, education, ...) and
+    long sections into smaller chunks. Chunks are ranked by embedding
+    similarity to the JD vector and packed greedily into the budget, then
+    emitted in their original order.
+    """
+
+    def __init__(self, embedding_service, token_budget: int, chunk_tokens: int):
+        self.embedding_service = embedding_service
+        self.token_budget = token_budget
+        self.chunk_tokens = chunk_tokens
+
+    def _truncate(self, text: str) -> str:
+        return text[:self.token_budget * 4]
+
+    def condense(self, cv_text: str, jd_embedding: Optional[List[float]]) -> str:
+        if estimate_tokens(cv_text) <= self.token_budget:
+            return cv_text
+        if not jd_embedding:
+            return self._truncate(cv_text)
+
+        chunks = [
+            (name, chunk)
+            for name, body in split_sections(cv_text)
+            for chunk in _chunk(body, self.chunk_tokens)
+        ]
+        if len(chunks) <= 1:
+            return self._truncate(cv_text)
+
+        vectors = np.asarray(
+            self.embedding_service.embed_texts([chunk for _, chunk in chunks]), dtype=np.float32
+        )
+        query = np.asarray(jd_embedding, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1) * (np.linalg.norm(query) or 1.0)
+        norms[norms == 0] = 1.0
+        similarity = (vectors @ query) / norms
+
+        selected, used = set(), 0
+        for i in np.argsort(-similarity):
+            cost = estimate_tokens(chunks[i][1])
+            if used + cost <= self.token_budget:
+                selected.add(int(i))
+                used += cost
+
+        condensed = "\n\n".join(chunks[i][1] for i in sorted(selected))
+        logger.info(
+            f"Condensed CV from ~{estimate_tokens(cv_text)} to ~{used} tokens "
+            f"({len(selected)}/{len(chunks)} chunks)"
+        )
+        return condensed or self._truncate(cv_text)
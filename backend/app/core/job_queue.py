@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.services.job_store import COMPLETED, FAILED, get_job_store
+
+logger = logging.getLogger(__name__)
+
+
+class MatchingJobQueue:
+    """Runs persisted matching jobs on a pool of asyncio workers.
+
+    Jobs live in the MatchingJobStore, so the queue itself holds no state:
+    workers claim the oldest queued job, run the RAG pipeline for its CVs and
+    store each result as it finishes. Jobs that were running when the process
+    stopped are requeued on start and resume with the CVs that have no
+    result yet.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or settings.match_job_workers
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def start(self) -> None:
+        """Requeue interrupted jobs and start the workers"""
+        store = get_job_store()
+        requeued = await asyncio.to_thread(store.requeue_running)
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted matching jobs")
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers; running jobs stay 'running' and are requeued on next start"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, request: Dict) -> str:
+        """Persist a job for the request (a MatchingRequest dict) and wake a worker"""
+        job_id = await asyncio.to_thread(get_job_store().create_job, request)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    async def _worker(self, index: int) -> None:
+        store = get_job_store()
+        while True:
+            # Clear before claiming so a submit landing during the claim still wakes us
+            self._wakeup.clear()
+            try:
+                job = await asyncio.to_thread(store.claim_next)
+            except Exception as e:
+                logger.error(f"Matching job worker {index} failed to claim a job: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.match_job_poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # e.g. the store failed while recording the outcome; keep the
+                # worker alive; the job stays 'running' and is requeued on restart
+                logger.error(f"Matching job worker {index} failed on job {job['job_id']}: {e}")
+
+    async def _run(self, job: Dict) -> None:
+        # Imported here so the queue can start before the orchestrator's heavy imports
+        from app.core.rag_orchestrator import get_rag_orchestrator
+        from app.services import get_document_store_service
+
+        store = get_job_store()
+        job_id, request = job["job_id"], job["request"]
+        try:
+            logger.info(f"Running matching job {job_id} ({job['completed']}/{job['total']} done)")
+            cv_ids = request["cv_ids"]
+            documents = await asyncio.to_thread(get_document_store_service().get_many, cv_ids)
+            cv_texts = {cv_id: documents[cv_id]["text"] for cv_id in cv_ids if cv_id in documents}
+            finished = await asyncio.to_thread(store.finished_cv_ids, job_id)
+            for cv_id in cv_ids:
+                if cv_id not in documents and cv_id not in finished:
+                    await asyncio.to_thread(store.add_result, job_id, cv_id, None, "CV not found in document store")
+
+            orchestrator = await asyncio.to_thread(get_rag_orchestrator)
+            async for cv_id, state in orchestrator.iter_process_many(
+                job_description=request["jd"]["job_description"],
+                job_title=request["jd"]["job_title"],
+                cv_texts=cv_texts,
+                llm_provider=request.get("llm_provider"),
+                similarity_threshold=request.get("similarity_threshold"),
+                llm_top_m=request.get("llm_top_m"),
+                skip_cv_ids=finished,
+                required_skills=request["jd"].get("required_skills")
+            ):
+                if state is not None and state.match_result:
+                    result, error = state.match_result.model_dump(mode="json"), None
+                else:
+                    result = None
+                    error = (state.error if state is not None else None) or "CV could not be scored"
+                await asyncio.to_thread(store.add_result, job_id, cv_id, result, error)
+
+            await asyncio.to_thread(store.finish_job, job_id, COMPLETED)
+            logger.info(f"Matching job {job_id} completed")
+        except asyncio.CancelledError:
+            logger.info(f"Matching job {job_id} interrupted; it will resume on restart")
+            raise
+        except Exception as e:
+            logger.error(f"Matching job {job_id} failed: {e}")
+            await asyncio.to_thread(store.finish_job, job_id, FAILED, str(e))
+
+# Global instance
+matching_job_queue = None
+
+def get_matching_job_queue() -> MatchingJobQueue:
+    global matching_job_queue
+    if matching_job_queue is None:
+        matching_job_queue = MatchingJobQueue()
+    return matching_job_queue
@@ -0,0 +1,85 @@
+from typing import List, Tuple
+
+# Bump SCORING_PROMPT_VERSION whenever SCORING_PROMPT changes so cached
+# LLM responses produced by the old template are not reused.
+SCORING_PROMPT_VERSION = "v1"
+
+SCORING_PROMPT = """
+You are an expert recruiter. Analyze the match between a CV and a job description.
+
+JOB TITLE: {job_title}
+JOB DESCRIPTION:
+{job_description}
+
+CV CONTENT:
+{cv_text}
+
+Provide your analysis in the following JSON format:
+{{
+    "match_score": <0-1>,
+    "reasoning": "<brief reasoning>",
+    "matched_skills": [<list of matched skills>],
+    "experience_alignment": "<excellent/good/fair/poor>",
+    "overall_assessment": "<brief assessment>"
+}}
+
+Respond with only the JSON, no additional text.
+"""
+
+
+def build_scoring_prompt(job_title: str, job_description: str, cv_text: str) -> str:
+    """Render the single-CV scoring prompt"""
+    return SCORING_PROMPT.format(
+        job_title=job_title,
+        job_description=job_description,
+        cv_text=cv_text
+    )
+
+
+BATCH_SCORING_PROMPT_VERSION = "v1"
+
+BATCH_SCORING_PROMPT = """
+You are an expert recruiter. Analyze how well each of the CVs below matches the job description.
+Score every CV independently of the others.
+
+JOB TITLE: {job_title}
+JOB DESCRIPTION:
+{job_description}
+
+{cv_blocks}
+
+Provide your analysis as a JSON array with exactly one object per CV, in the following format:
+[
+    {{
+        "cv_id": "<cv_id exactly as given>",
+        "match_score": <0-1>,
+        "reasoning": "<brief reasoning>",
+        "matched_skills": [<list of matched skills>],
+        "experience_alignment": "<excellent/good/fair/poor>",
+        "overall_assessment": "<brief assessment>"
+    }}
+]
+
+Respond with only the JSON array, no additional text.
+"""
+
+BATCH_CV_BLOCK = """=== CV {cv_id} ===
+{cv_text}
+=== END CV {cv_id} ==="""
+
+
+def build_batch_scoring_prompt(job_title: str, job_description: str, cvs: List[Tuple[str, str]]) -> str:
+    """Render the multi-CV scoring prompt for (cv_id, cv_text) pairs"""
+    cv_blocks = "\n\n".join(
+        BATCH_CV_BLOCK.format(cv_id=cv_id, cv_text=cv_text) for cv_id, cv_text in cvs
+    )
+    return BATCH_SCORING_PROMPT.format(
+        job_title=job_title,
+        job_description=job_description,
+        cv_blocks=cv_blocks
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)"""
+    return len(text) // 4 + 1
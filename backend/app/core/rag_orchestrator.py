@@ -1,29 +1,76 @@
 import logging
 import json
-from typing import List, Dict, Any
-from langgraph.graph import StateGraph
+import asyncio
+import math
+import threading
+import time
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, AsyncIterator, Optional, Set, Tuple
 from pydantic import BaseModel
 from app.services import (
     get_embedding_service,
     get_vector_store_service,
     get_llm_service,
-    get_observability_service
+    get_observability_service,
+    get_llm_response_cache,
+    LLMResponseCache,
+    DocumentStoreService,
+    SingleFlight,
+    get_single_flight,
+    get_lexical_index
 )
+from app.services.lexical_index import reciprocal_rank_fusion, skill_terms
 from app.models.schemas import MatchResult
+from app.core.config import settings
+from app.services.metrics_service import timed_stage
+from app.core.cv_condenser import CVCondenser
+from app.core.prompts import (
+    SCORING_PROMPT_VERSION,
+    BATCH_SCORING_PROMPT_VERSION,
+    BATCH_CV_BLOCK,
+    build_scoring_prompt,
+    build_batch_scoring_prompt,
+    estimate_tokens
+)
 
 logger = logging.getLogger(__name__)
 
+class JDContextState(BaseModel):
+    """State for the per-request JD stage, shared by every CV in a request"""
+    job_description: str
+    job_title: str
+    cv_ids: List[str] = []
+    similarity_threshold: Optional[float] = None
+    llm_top_m: Optional[int] = None
+    required_skills: Optional[List[str]] = None
+    embedding: Optional[List[float]] = None
+    similar_cvs: Optional[List[Dict]] = None
+    vector_scores: Dict[str, float] = {}
+    lexical_scores: Dict[str, float] = {}  # BM25 over required_skills, requested CVs only
+    skill_matches: Dict[str, List[str]] = {}  # required skills found in each requested CV
+    min_skill_matches: int = 0
+    llm_candidates: List[str] = []
+    error: Optional[str] = None
+
 class CVMatchingState(BaseModel):
     """State for CV matching workflow"""
     job_description: str
     job_title: str
     cv_id: str
     cv_text: str
-    embedding: List[float] = None
-    similar_cvs: List[Dict] = None
-    llm_analysis: str = None
-    match_result: MatchResult = None
-    error: str = None
+    cv_content_hash: Optional[str] = None
+    llm_provider: Optional[str] = None
+    embedding: Optional[List[float]] = None
+    similar_cvs: Optional[List[Dict]] = None
+    vector_score: Optional[float] = None
+    skip_llm: bool = False
+    skip_reason: Optional[str] = None
+    skill_matches: List[str] = []
+    llm_analysis: Optional[Dict[str, Any]] = None
+    llm_cached: bool = False
+    match_result: Optional[MatchResult] = None
+    error: Optional[str] = None
 
 class RAGOrchestrator:
     """LangGraph-based orchestrator for CV matching RAG pipeline"""
@@ -32,31 +79,67 @@ class RAGOrchestrator:
         self.embedding_service = get_embedding_service()
         self.vector_store = get_vector_store_service()
         self.observability = get_observability_service()
+        self.lexical_index = get_lexical_index()
+        self.condenser = CVCondenser(
+            self.embedding_service,
+            token_budget=settings.cv_token_budget,
+            chunk_tokens=settings.cv_chunk_tokens
+        )
+        self.scoring_flight = get_single_flight("llm_scoring")
+        self.batch_scoring_flight = get_single_flight("llm_scoring_batch")
+        self.request_graph = self._build_request_graph()
         self.graph = self._build_graph()
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.match_concurrency,
+            thread_name_prefix="cv-pipeline"
+        )
     
-    def _build_graph(self):
-        """Build the LangGraph workflow"""
-        workflow = StateGraph(CVMatchingState)
+    def _build_request_graph(self):
+        """Build the per-request workflow (runs once per job description)"""
+        from langgraph.graph import StateGraph
+        workflow = StateGraph(JDContextState)
         
         # Add nodes
         workflow.add_node("embed_jd", self.embed_jd)
         workflow.add_node("retrieve_candidates", self.retrieve_candidates)
+        workflow.add_node("score_candidates", self.score_candidates)
+        
+        # Add edges
+        workflow.add_edge("embed_jd", "retrieve_candidates")
+        workflow.add_edge("retrieve_candidates", "score_candidates")
+        
+        workflow.set_entry_point("embed_jd")
+        workflow.set_finish_point("score_candidates")
+        
+        return workflow.compile()
+    
+    def _build_graph(self):
+        """Build the per-CV workflow (reuses the shared JD context)"""
+        from langgraph.graph import StateGraph
+        workflow = StateGraph(CVMatchingState)
+        
+        # Add nodes
+        workflow.add_node("gate_candidate", self.gate_candidate)
         workflow.add_node("analyze_cv", self.analyze_cv)
         workflow.add_node("llm_scoring", self.llm_scoring)
         workflow.add_node("format_result", self.format_result)
         
-        # Add edges
-        workflow.add_edge("embed_jd", "retrieve_candidates")
-        workflow.add_edge("retrieve_candidates", "analyze_cv")
+        # Add edges: weak candidates skip straight to a vector-only result
+        workflow.add_conditional_edges(
+            "gate_candidate",
+            self.route_candidate,
+            {"analyze_cv": "analyze_cv", "format_result": "format_result"}
+        )
         workflow.add_edge("analyze_cv", "llm_scoring")
         workflow.add_edge("llm_scoring", "format_result")
         
-        workflow.set_entry_point("embed_jd")
+        workflow.set_entry_point("gate_candidate")
         workflow.set_finish_point("format_result")
         
         return workflow.compile()
     
-    def embed_jd(self, state: CVMatchingState) -> CVMatchingState:
+    @timed_stage("embed_jd")
+    def embed_jd(self, state: JDContextState) -> JDContextState:
         """Embed job description"""
         try:
             logger.info(f"Embedding JD: {state.job_title}")
@@ -73,105 +156,348 @@ class RAGOrchestrator:
             state.error = str(e)
             return state
     
-    def retrieve_candidates(self, state: CVMatchingState) -> CVMatchingState:
-        """Retrieve similar candidates from vector store"""
+    @timed_stage("retrieve_candidates")
+    def retrieve_candidates(self, state: JDContextState) -> JDContextState:
+        """Retrieve similar candidates: dense vector search, fused with BM25 over required skills"""
+        if state.error:
+            return state
         try:
             logger.info(f"Retrieving candidates for JD: {state.job_title}")
             similar = self.vector_store.query_similar(state.embedding, top_k=10)
-            state.similar_cvs = [
-                {
+            candidates = {
+                match.id: {
                     "id": match.id,
                     "score": match.score,
                     "metadata": match.metadata
                 }
                 for match in similar
-            ]
+            }
+            if state.required_skills:
+                self._retrieve_lexical(state, [match.id for match in similar], candidates)
+            state.similar_cvs = list(candidates.values())[:10]
             return state
         except Exception as e:
             logger.error(f"Error retrieving candidates: {e}")
             state.error = str(e)
             return state
     
+    def _retrieve_lexical(self, state: JDContextState, dense_ranking: List[str], candidates: Dict[str, Dict]) -> None:
+        """Add BM25 hits to the candidates, reorder them by reciprocal rank fusion and score the requested CVs"""
+        try:
+            query = " ".join(state.required_skills)
+            lexical = self.lexical_index.search(query, top_k=10)
+            fused = reciprocal_rank_fusion(
+                [dense_ranking, [cv_id for cv_id, _ in lexical]], k=settings.rrf_k
+            )
+            for cv_id, score in lexical:
+                candidates.setdefault(cv_id, {"id": cv_id, "score": None, "metadata": {}})["lexical_score"] = score
+            ordered = sorted(candidates.values(), key=lambda c: (-fused[c["id"]], c["id"]))
+            candidates.clear()
+            for candidate in ordered:
+                candidate["fused_score"] = fused[candidate["id"]]
+                candidates[candidate["id"]] = candidate
+            
+            if state.cv_ids:
+                state.lexical_scores = dict(self.lexical_index.search(query, top_k=0, cv_ids=state.cv_ids))
+                state.skill_matches = self.lexical_index.match_skills(state.required_skills, state.cv_ids)
+        except Exception as e:
+            # Keyword retrieval is an optimisation; fall back to dense-only ranking
+            logger.error(f"Error in lexical retrieval: {e}")
+            state.required_skills = None
+    
+    @timed_stage("score_candidates")
+    def score_candidates(self, state: JDContextState) -> JDContextState:
+        """Score requested CVs by vector similarity and pick the ones worth an LLM call"""
+        if state.error or not state.cv_ids:
+            return state
+        try:
+            logger.info(f"Scoring {len(state.cv_ids)} candidates by vector similarity")
+            vectors = self.vector_store.fetch_vectors(state.cv_ids)
+            if vectors:
+                ids = list(vectors)
+                matrix = np.asarray([vectors[cv_id] for cv_id in ids], dtype=np.float32)
+                query = np.asarray(state.embedding, dtype=np.float32)
+                norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+                norms[norms == 0] = 1.0
+                scores = (matrix @ query) / norms
+                state.vector_scores = {cv_id: float(score) for cv_id, score in zip(ids, scores)}
+            
+            if state.similarity_threshold is None:
+                state.similarity_threshold = settings.similarity_threshold
+            if state.llm_top_m is None:
+                state.llm_top_m = settings.llm_top_m
+            threshold, top_m = state.similarity_threshold, state.llm_top_m
+            
+            # CVs without a stored vector can't be gated on similarity; they
+            # only get an LLM call if the top-M has room after scored CVs
+            above = sorted(
+                (cv_id for cv_id, score in state.vector_scores.items() if score >= threshold),
+                key=lambda cv_id: (-state.vector_scores[cv_id], cv_id)
+            )
+            unknown = [cv_id for cv_id in state.cv_ids if cv_id not in state.vector_scores]
+            
+            filtered = []
+            if state.required_skills:
+                # Cheap skills filter first, then rank survivors by fusing vector and BM25 ranks.
+                # Skill matching is exact-term, so filtered-out CVs still fill any top-M slots left
+                state.min_skill_matches = math.ceil(
+                    settings.skill_filter_min_fraction * len(state.required_skills)
+                )
+                has_skills = lambda cv_id: len(state.skill_matches.get(cv_id, [])) >= state.min_skill_matches
+                filtered = [cv_id for cv_id in above if not has_skills(cv_id)]
+                above = [cv_id for cv_id in above if has_skills(cv_id)]
+                unknown = [cv_id for cv_id in unknown if has_skills(cv_id)]
+                lexical_ranking = sorted(
+                    state.lexical_scores, key=lambda cv_id: (-state.lexical_scores[cv_id], cv_id)
+                )
+                fused = reciprocal_rank_fusion([above, lexical_ranking], k=settings.rrf_k)
+                above.sort(key=lambda cv_id: (-fused[cv_id], cv_id))
+            state.llm_candidates = (above + unknown + filtered)[:top_m]
+            return state
+        except Exception as e:
+            # Gating is an optimisation; without scores every CV goes to the LLM
+            logger.error(f"Error scoring candidates: {e}")
+            state.llm_candidates = list(state.cv_ids)
+            return state
+    
+    @timed_stage("gate_candidate")
+    def gate_candidate(self, state: CVMatchingState) -> CVMatchingState:
+        """Decide whether this CV is worth an LLM call"""
+        if state.skip_llm:
+            logger.info(f"Skipping LLM scoring for CV {state.cv_id}: {state.skip_reason}")
+        return state
+    
+    @staticmethod
+    def route_candidate(state: CVMatchingState) -> str:
+        return "format_result" if state.skip_llm else "analyze_cv"
+    
+    @timed_stage("analyze_cv")
     def analyze_cv(self, state: CVMatchingState) -> CVMatchingState:
         """Analyze CV content"""
         try:
             logger.info(f"Analyzing CV: {state.cv_id}")
-            # Extract key information from CV
-            lines = state.cv_text.split('\n')
-            state.cv_text = '\n'.join(lines[:50])  # Limit to first 50 lines for analysis
+            # Keep the sections most relevant to the JD within the prompt token budget
+            state.cv_text = self.condenser.condense(state.cv_text, state.embedding)
             return state
         except Exception as e:
             logger.error(f"Error analyzing CV: {e}")
             state.error = str(e)
             return state
     
-    def llm_scoring(self, state: CVMatchingState) -> CVMatchingState:
+    @timed_stage("llm_scoring")
+    async def llm_scoring(self, state: CVMatchingState) -> CVMatchingState:
         """Use LLM to score the match"""
+        if state.error:
+            return state
         try:
             logger.info(f"Scoring CV match with LLM: {state.cv_id}")
             
-            llm = get_llm_service()
-            
-            prompt = f"""
-You are an expert recruiter. Analyze the match between a CV and a job description.
-
-JOB TITLE: {state.job_title}
-JOB DESCRIPTION:
-{state.job_description}
-
-CV CONTENT:
-{state.cv_text}
-
-Provide your analysis in the following JSON format:
-{{
-    "match_score": <0-1>,
-    "reasoning": "<brief reasoning>",
-    "matched_skills": [<list of matched skills>],
-    "experience_alignment": "<excellent/good/fair/poor>",
-    "overall_assessment": "<brief assessment>"
-}}
-
-Respond with only the JSON, no additional text.
-"""
-            
-            response = llm.invoke(prompt)
-            
-            try:
-                analysis = json.loads(response)
-                state.llm_analysis = analysis
-            except json.JSONDecodeError:
-                logger.warning("Failed to parse LLM response as JSON")
-                state.llm_analysis = {
-                    "match_score": 0.5,
-                    "reasoning": response,
-                    "matched_skills": [],
-                    "experience_alignment": "unknown",
-                    "overall_assessment": "Analysis incomplete"
-                }
-            
+            llm = get_llm_service(state.llm_provider)
+            # Identical concurrent scorings (same provider, model, prompt, JD and CV) share one call
+            key = self._scoring_cache_key(state, llm, SCORING_PROMPT_VERSION)
+            state.llm_analysis, state.llm_cached = await self.scoring_flight.ado(
+                key, lambda: self._score_one(state, llm, key)
+            )
             return state
         except Exception as e:
             logger.error(f"Error in LLM scoring: {e}")
             state.error = str(e)
             return state
     
+    async def _score_one(self, state: CVMatchingState, llm, cache_key: str) -> Tuple[Dict[str, Any], bool]:
+        """Cache lookup, then one LLM call; returns (analysis, served_from_cache)"""
+        cache = get_llm_response_cache()
+        if cache:
+            cached = await asyncio.to_thread(cache.get, cache_key)
+            if cached is not None:
+                return cached, True
+        
+        prompt = build_scoring_prompt(state.job_title, state.job_description, state.cv_text)
+        
+        started = time.perf_counter()
+        response = await llm.ainvoke(prompt)
+        latency_ms = (time.perf_counter() - started) * 1000
+        
+        try:
+            analysis = json.loads(response)
+            if cache:
+                await asyncio.to_thread(cache.put, cache_key, analysis, latency_ms)
+            return analysis, False
+        except json.JSONDecodeError:
+            logger.warning("Failed to parse LLM response as JSON")
+            return {
+                "match_score": 0.5,
+                "reasoning": response,
+                "matched_skills": [],
+                "experience_alignment": "unknown",
+                "overall_assessment": "Analysis incomplete"
+            }, False
+    
+    @staticmethod
+    def _scoring_cache_key(state: CVMatchingState, llm, prompt_version: str) -> str:
+        return LLMResponseCache.make_key(
+            llm.provider,
+            llm.model_name,
+            prompt_version,
+            f"{state.job_title}\n{state.job_description}",
+            state.cv_text
+        )
+    
+    @staticmethod
+    def _parse_batch_response(response: str) -> Dict[str, Dict]:
+        """Parse a batch scoring response into {cv_id: analysis}"""
+        parsed = json.loads(response)
+        if isinstance(parsed, dict):
+            parsed = parsed.get("results", [])
+        if not isinstance(parsed, list):
+            raise ValueError("Batch response is not a JSON array")
+        
+        analyses = {}
+        for item in parsed:
+            if not isinstance(item, dict) or "cv_id" not in item:
+                continue
+            try:
+                float(item.get("match_score"))
+            except (TypeError, ValueError):
+                # Drop entries without a numeric score; those CVs fall back to single-CV scoring
+                continue
+            analyses[str(item["cv_id"])] = {k: v for k, v in item.items() if k != "cv_id"}
+        return analyses
+    
+    def _pack_batches(self, states: List[CVMatchingState]) -> List[List[CVMatchingState]]:
+        """Split CVs into batches that fit settings.llm_batch_token_budget"""
+        if not states:
+            return []
+        base_tokens = estimate_tokens(
+            build_batch_scoring_prompt(states[0].job_title, states[0].job_description, [])
+        )
+        batches, current, used = [], [], base_tokens
+        for state in states:
+            cost = estimate_tokens(BATCH_CV_BLOCK.format(cv_id=state.cv_id, cv_text=state.cv_text))
+            if current and (
+                used + cost > settings.llm_batch_token_budget
+                or len(current) >= settings.llm_batch_max_cvs
+            ):
+                batches.append(current)
+                current, used = [], base_tokens
+            current.append(state)
+            used += cost
+        batches.append(current)
+        return batches
+    
+    @timed_stage("llm_scoring_batch")
+    async def score_batch(self, states: List[CVMatchingState]) -> List[CVMatchingState]:
+        """Score several analyzed CVs against one JD with a single LLM call.
+        
+        CVs missing from the parsed response (or the whole batch, if the
+        response does not parse) fall back to single-CV llm_scoring.
+        """
+        if len(states) == 1:
+            return [await self.llm_scoring(states[0])]
+        
+        first = states[0]
+        analyses: Dict[str, Dict] = {}
+        latency_ms = 0.0
+        try:
+            logger.info(f"Batch scoring {len(states)} CVs with LLM")
+            llm = get_llm_service(first.llm_provider)
+            prompt = build_batch_scoring_prompt(
+                first.job_title,
+                first.job_description,
+                [(state.cv_id, state.cv_text) for state in states]
+            )
+            started = time.perf_counter()
+            response = await self.batch_scoring_flight.ado(
+                SingleFlight.make_key(llm.provider, llm.model_name, prompt),
+                lambda: llm.ainvoke(prompt)
+            )
+            latency_ms = (time.perf_counter() - started) * 1000
+            analyses = self._parse_batch_response(response)
+        except Exception as e:
+            logger.warning(f"Batch scoring failed, falling back to single-CV scoring: {e}")
+        
+        cache = get_llm_response_cache()
+        for state in states:
+            analysis = analyses.get(state.cv_id)
+            if analysis is None:
+                await self.llm_scoring(state)
+                continue
+            state.llm_analysis = analysis
+            if cache:
+                await asyncio.to_thread(
+                    cache.put,
+                    self._scoring_cache_key(state, llm, BATCH_SCORING_PROMPT_VERSION),
+                    analysis,
+                    latency_ms / len(states)
+                )
+        return states
+    
+    async def _score_batched(self, states: List[CVMatchingState]) -> List[CVMatchingState]:
+        """analyze_cv -> cache lookup -> batched llm_scoring -> format_result for a group of CVs"""
+        def analyze_all():
+            for state in states:
+                if not state.skip_llm:
+                    self.analyze_cv(state)
+        
+        await asyncio.get_running_loop().run_in_executor(self.executor, analyze_all)
+        
+        pending = []
+        cache = get_llm_response_cache()
+        for state in states:
+            if state.error or state.skip_llm:
+                continue
+            if cache:
+                llm = get_llm_service(state.llm_provider)
+                cached = await asyncio.to_thread(
+                    cache.get, self._scoring_cache_key(state, llm, BATCH_SCORING_PROMPT_VERSION)
+                )
+                if cached is not None:
+                    state.llm_analysis = cached
+                    state.llm_cached = True
+                    continue
+            pending.append(state)
+        
+        await asyncio.gather(*(self.score_batch(batch) for batch in self._pack_batches(pending)))
+        
+        for state in states:
+            self.format_result(state)
+        return states
+    
+    @timed_stage("format_result")
     def format_result(self, state: CVMatchingState) -> CVMatchingState:
         """Format the final result"""
         try:
             if state.error:
                 return state
             
-            analysis = state.llm_analysis or {}
-            
-            state.match_result = MatchResult(
-                cv_id=state.cv_id,
-                filename=state.cv_id,
-                match_score=float(analysis.get("match_score", 0.0)),
-                reasoning=analysis.get("reasoning", ""),
-                matched_skills=analysis.get("matched_skills", []),
-                experience_alignment=analysis.get("experience_alignment", ""),
-                overall_assessment=analysis.get("overall_assessment", "")
-            )
+            if state.skip_llm:
+                state.match_result = MatchResult(
+                    cv_id=state.cv_id,
+                    filename=state.cv_id,
+                    match_score=min(max(state.vector_score or 0.0, 0.0), 1.0),
+                    reasoning=f"Vector similarity only: {state.skip_reason}",
+                    matched_skills=state.skill_matches,
+                    experience_alignment="",
+                    overall_assessment="Not assessed by LLM",
+                    vector_score=state.vector_score,
+                    llm_scored=False,
+                    content_hash=state.cv_content_hash
+                )
+            else:
+                analysis = state.llm_analysis or {}
+                
+                state.match_result = MatchResult(
+                    cv_id=state.cv_id,
+                    filename=state.cv_id,
+                    match_score=float(analysis.get("match_score", 0.0)),
+                    reasoning=analysis.get("reasoning", ""),
+                    matched_skills=analysis.get("matched_skills", []),
+                    experience_alignment=analysis.get("experience_alignment", ""),
+                    overall_assessment=analysis.get("overall_assessment", ""),
+                    cached=state.llm_cached,
+                    vector_score=state.vector_score,
+                    content_hash=state.cv_content_hash
+                )
             
             self.observability.log_cv_matching(
                 state.cv_id,
@@ -186,23 +512,234 @@ Respond with only the JSON, no additional text.
             state.error = str(e)
             return state
     
-    def process(self, job_description: str, job_title: str, cv_id: str, cv_text: str):
-        """Process CV matching workflow"""
-        initial_state = CVMatchingState(
+    def prepare_jd(
+        self,
+        job_description: str,
+        job_title: str,
+        cv_ids: Optional[List[str]] = None,
+        similarity_threshold: Optional[float] = None,
+        llm_top_m: Optional[int] = None,
+        required_skills: Optional[List[str]] = None
+    ) -> JDContextState:
+        """Embed the JD, retrieve candidates and gate the requested CVs once for a whole request"""
+        initial_state = JDContextState(
             job_description=job_description,
             job_title=job_title,
-            cv_id=cv_id,
-            cv_text=cv_text
+            cv_ids=cv_ids or [],
+            similarity_threshold=similarity_threshold,
+            llm_top_m=llm_top_m,
+            required_skills=[skill for skill in (required_skills or []) if skill_terms(skill)] or None
         )
         
-        result = self.graph.invoke(initial_state)
+        result = self.request_graph.invoke(initial_state)
         return result
+    
+    async def aprocess(
+        self,
+        job_description: str,
+        job_title: str,
+        cv_id: str,
+        cv_text: str,
+        jd_context: Optional[JDContextState] = None,
+        llm_provider: Optional[str] = None
+    ):
+        """Process CV matching workflow"""
+        if jd_context is None:
+            jd_context = await asyncio.get_running_loop().run_in_executor(
+                self.executor,
+                lambda: self.prepare_jd(job_description, job_title, cv_ids=[cv_id])
+            )
+        
+        initial_state = self._initial_state(jd_context, cv_id, cv_text, llm_provider)
+        
+        result = await self.graph.ainvoke(initial_state)
+        return result
+    
+    def process(
+        self,
+        job_description: str,
+        job_title: str,
+        cv_id: str,
+        cv_text: str,
+        jd_context: Optional[JDContextState] = None,
+        llm_provider: Optional[str] = None
+    ):
+        """Process CV matching workflow (blocking; for callers outside an event loop)"""
+        return asyncio.run(self.aprocess(
+            job_description, job_title, cv_id, cv_text, jd_context, llm_provider
+        ))
+    
+    @staticmethod
+    def _initial_state(
+        jd_context: JDContextState,
+        cv_id: str,
+        cv_text: str,
+        llm_provider: Optional[str]
+    ) -> CVMatchingState:
+        state = CVMatchingState(
+            job_description=jd_context.job_description,
+            job_title=jd_context.job_title,
+            cv_id=cv_id,
+            cv_text=cv_text,
+            cv_content_hash=DocumentStoreService.content_hash(cv_text),
+            llm_provider=llm_provider,
+            embedding=jd_context.embedding,
+            similar_cvs=jd_context.similar_cvs,
+            vector_score=jd_context.vector_scores.get(cv_id),
+            skill_matches=jd_context.skill_matches.get(cv_id, []),
+            error=jd_context.error
+        )
+        if jd_context.cv_ids and cv_id not in jd_context.llm_candidates:
+            state.skip_llm = True
+            if jd_context.required_skills and len(state.skill_matches) < jd_context.min_skill_matches:
+                state.skip_reason = (
+                    f"matches {len(state.skill_matches)} of {len(jd_context.required_skills)} required skills"
+                )
+            elif state.vector_score is None:
+                state.skip_reason = f"no stored vector and top {jd_context.llm_top_m} already full"
+            elif state.vector_score < jd_context.similarity_threshold:
+                state.skip_reason = (
+                    f"similarity {state.vector_score:.3f} below threshold "
+                    f"{jd_context.similarity_threshold:.3f}"
+                )
+            else:
+                state.skip_reason = (
+                    f"similarity {state.vector_score:.3f} outside top {jd_context.llm_top_m}"
+                )
+        return state
+    
+    async def iter_process_many(
+        self,
+        job_description: str,
+        job_title: str,
+        cv_texts: Dict[str, str],
+        llm_provider: Optional[str] = None,
+        similarity_threshold: Optional[float] = None,
+        llm_top_m: Optional[int] = None,
+        skip_cv_ids: Optional[Set[str]] = None,
+        required_skills: Optional[List[str]] = None
+    ) -> AsyncIterator[Tuple[str, Optional[CVMatchingState]]]:
+        """Run the per-CV pipelines concurrently, yielding (cv_id, state) as each finishes.
+        
+        At most settings.match_concurrency pipelines run at once. A CV that
+        raises or exceeds settings.cv_pipeline_timeout yields a None state
+        instead of holding up the others. With settings.llm_batch_scoring the
+        CVs are scored in groups of settings.llm_batch_max_cvs, one LLM call
+        per token-budgeted batch. CVs in skip_cv_ids still count towards the
+        shared JD stage (retrieval and LLM gating) but are not processed.
+        With required_skills, CVs matching too few of them skip the LLM and
+        the rest are ranked by fusing vector and BM25 keyword ranks.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(settings.match_concurrency)
+        
+        # Shared stage: computed once, reused by every CV below
+        jd_context = await loop.run_in_executor(
+            self.executor,
+            self.prepare_jd,
+            job_description,
+            job_title,
+            list(cv_texts),
+            similarity_threshold,
+            llm_top_m,
+            required_skills
+        )
+        
+        async def run_one(cv_id: str, cv_text: str):
+            async with semaphore:
+                try:
+                    state = await asyncio.wait_for(
+                        self.aprocess(
+                            job_description,
+                            job_title,
+                            cv_id,
+                            cv_text,
+                            jd_context,
+                            llm_provider
+                        ),
+                        timeout=settings.cv_pipeline_timeout
+                    )
+                    return [(cv_id, state)]
+                except asyncio.TimeoutError:
+                    logger.error(f"Timed out processing CV {cv_id}")
+                except Exception as e:
+                    logger.error(f"Error processing CV {cv_id}: {e}")
+                return [(cv_id, None)]
+        
+        async def run_group(group: List[Tuple[str, str]]):
+            states = [
+                self._initial_state(jd_context, cv_id, cv_text, llm_provider)
+                for cv_id, cv_text in group
+            ]
+            async with semaphore:
+                try:
+                    await asyncio.wait_for(
+                        self._score_batched(states),
+                        timeout=settings.cv_pipeline_timeout
+                    )
+                    return [(state.cv_id, state) for state in states]
+                except asyncio.TimeoutError:
+                    logger.error(f"Timed out batch scoring {len(group)} CVs")
+                except Exception as e:
+                    logger.error(f"Error batch scoring {len(group)} CVs: {e}")
+                return [(cv_id, None) for cv_id, _ in group]
+        
+        items = [item for item in cv_texts.items() if not skip_cv_ids or item[0] not in skip_cv_ids]
+        if settings.llm_batch_scoring:
+            size = settings.llm_batch_max_cvs
+            tasks = [
+                asyncio.ensure_future(run_group(items[i:i + size]))
+                for i in range(0, len(items), size)
+            ]
+        else:
+            tasks = [
+                asyncio.ensure_future(run_one(cv_id, cv_text))
+                for cv_id, cv_text in items
+            ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for item in await next_done:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def process_many(
+        self,
+        job_description: str,
+        job_title: str,
+        cv_texts: Dict[str, str],
+        llm_provider: Optional[str] = None,
+        similarity_threshold: Optional[float] = None,
+        llm_top_m: Optional[int] = None,
+        skip_cv_ids: Optional[Set[str]] = None,
+        required_skills: Optional[List[str]] = None
+    ) -> List[CVMatchingState]:
+        """Run the per-CV pipelines concurrently and collect the finished states"""
+        states = []
+        async for _, state in self.iter_process_many(
+            job_description,
+            job_title,
+            cv_texts,
+            llm_provider,
+            similarity_threshold,
+            llm_top_m,
+            skip_cv_ids,
+            required_skills
+        ):
+            if state is not None:
+                states.append(state)
+        return states
 
 # Global instance
 rag_orchestrator = None
+# Routes, job workers and warmup build it from worker threads
+_rag_orchestrator_lock = threading.Lock()
 
 def get_rag_orchestrator() -> RAGOrchestrator:
     global rag_orchestrator
     if rag_orchestrator is None:
-        rag_orchestrator = RAGOrchestrator()
+        with _rag_orchestrator_lock:
+            if rag_orchestrator is None:
+                rag_orchestrator = RAGOrchestrator()
     return rag_orchestrator
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StartupState:
+    """Tracks warmup progress and cold-start timings for the readiness probe"""
+
+    def __init__(self):
+        self.process_started = time.perf_counter()
+        self.import_ms: Optional[float] = None
+        self.steps_ms: Dict[str, float] = {}
+        self.cold_start_ms: Optional[float] = None
+        self.ready = False
+        self.error: Optional[str] = None
+
+    def mark_imported(self) -> None:
+        self.import_ms = round((time.perf_counter() - self.process_started) * 1000, 1)
+
+    def to_dict(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "import_ms": self.import_ms,
+            "warmup_steps_ms": self.steps_ms,
+            "cold_start_ms": self.cold_start_ms
+        }
+
+# Global instance
+startup_state = StartupState()
+
+
+def _warm_embeddings() -> None:
+    from app.services import get_embedding_service
+    get_embedding_service().warmup()
+
+
+def _warm_vector_store() -> None:
+    from app.services import get_vector_store_service
+    get_vector_store_service()
+
+
+def _warm_document_store() -> None:
+    from app.services import get_document_store_service
+    get_document_store_service()
+
+
+def _warm_lexical_index() -> None:
+    from app.services import get_lexical_index
+    get_lexical_index()
+
+
+def _warm_orchestrator() -> None:
+    from app.core.rag_orchestrator import get_rag_orchestrator
+    get_rag_orchestrator()
+
+
+WARMUP_STEPS: Dict[str, Callable[[], None]] = {
+    "embedding_model": _warm_embeddings,
+    "vector_store": _warm_vector_store,
+    "document_store": _warm_document_store,
+    "lexical_index": _warm_lexical_index,
+    "orchestrator": _warm_orchestrator
+}
+
+
+async def warm_up(state: StartupState = startup_state) -> None:
+    """Load the model, run a warmup inference and connect stores, then mark ready"""
+    try:
+        for name, step in WARMUP_STEPS.items():
+            started = time.perf_counter()
+            await asyncio.to_thread(step)
+            state.steps_ms[name] = round((time.perf_counter() - started) * 1000, 1)
+            logger.info(f"Warmup step {name} took {state.steps_ms[name]}ms")
+        state.ready = True
+    except Exception as e:
+        logger.error(f"Warmup failed: {e}")
+        state.error = str(e)
+    finally:
+        state.cold_start_ms = round((time.perf_counter() - state.process_started) * 1000, 1)
+        logger.info(f"Cold start finished in {state.cold_start_ms}ms (ready={state.ready})")
+
+
+def skip_warmup(state: StartupState = startup_state) -> None:
+    """Mark ready without warming (settings.warmup_on_startup disabled)"""
+    state.ready = True
+    state.cold_start_ms = round((time.perf_counter() - state.process_started) * 1000, 1)
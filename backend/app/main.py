@@ -1,18 +1,48 @@
 import logging
+import asyncio
+from contextlib import asynccontextmanager
+from app.core.startup import startup_state, warm_up, skip_warmup
+from app.core.job_queue import get_matching_job_queue
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.routes import cv_router, matching_router
+from app.services import get_observability_service, render_metrics, shutdown_document_parser_service
+
+startup_state.mark_imported()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info(f"App imported in {startup_state.import_ms}ms")
+    # Warm up in the background so the server can answer /health and /ready meanwhile
+    warmup_task = None
+    if settings.warmup_on_startup:
+        warmup_task = asyncio.create_task(warm_up())
+    else:
+        skip_warmup()
+    # Matching job workers; jobs interrupted by the last shutdown resume here
+    job_queue = get_matching_job_queue()
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
+    # Stop the parser worker processes, including pools retired after a timeout
+    shutdown_document_parser_service()
+    # Export any queued observability events before the process exits
+    get_observability_service().shutdown()
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.api_title,
     version=settings.api_version,
-    debug=settings.debug
+    debug=settings.debug,
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -45,6 +75,17 @@ async def health_check():
         "backend_url": settings.backend_url
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the model is loaded and stores are connected"""
+    body = startup_state.to_dict()
+    return JSONResponse(body, status_code=200 if startup_state.ready else 503)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics: per-stage, vector store and LLM latency histograms, LLM router decisions"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
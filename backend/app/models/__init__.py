@@ -4,6 +4,8 @@ from .schemas import (
     MatchResult,
     MatchingRequest,
     MatchingResponse,
+    MatchingJobSubmitted,
+    MatchingJobResponse,
     EmbeddingRequest,
     EmbeddingResponse
 )
@@ -14,6 +16,8 @@ __all__ = [
     "MatchResult",
     "MatchingRequest",
     "MatchingResponse",
+    "MatchingJobSubmitted",
+    "MatchingJobResponse",
     "EmbeddingRequest",
     "EmbeddingResponse"
 ]
@@ -20,17 +20,25 @@ class MatchResult(BaseModel):
     matched_skills: List[str]
     experience_alignment: str
     overall_assessment: str
+    cached: bool = False  # served from the LLM response cache
+    vector_score: Optional[float] = None  # cosine similarity between JD and CV vectors
+    llm_scored: bool = True  # False when gated out and scored on vector similarity only
+    content_hash: Optional[str] = None  # SHA-256 of the CV text this result was scored on
 
 class MatchingRequest(BaseModel):
     jd: JDRequest
     cv_ids: List[str]
-    llm_provider: str = "openai"
+    llm_provider: str = "openai"  # or "auto" to route across providers by latency and health
     top_k: int = 5
+    similarity_threshold: Optional[float] = None  # defaults to settings.similarity_threshold
+    llm_top_m: Optional[int] = None  # max CVs sent to the LLM, defaults to settings.llm_top_m
+    incremental: bool = True  # reuse saved results for unchanged CVs; False rescores every CV
 
 class MatchingResponse(BaseModel):
     job_title: str
     total_cvs_matched: int
     matches: List[MatchResult]
+    cvs_scored: Optional[int] = None  # CVs scored by this request; the rest came from the saved run
     timestamp: datetime = None
 
     class Config:
@@ -52,6 +60,27 @@ class MatchingResponse(BaseModel):
             }
         }
 
+class MatchingJobSubmitted(BaseModel):
+    job_id: str
+    status: str
+    total: int
+
+class MatchingJobResponse(BaseModel):
+    job_id: str
+    status: str  # queued, running, completed or failed
+    job_title: str
+    total: int  # CVs in the request
+    completed: int  # CVs finished so far, including failures
+    failed: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    offset: int
+    limit: int
+    total_matches: int  # scored CVs available to page through
+    matches: List[MatchResult]
+
 class EmbeddingRequest(BaseModel):
     text: str
 
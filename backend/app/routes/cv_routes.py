@@ -1,8 +1,20 @@
 import logging
+import asyncio
+import os
+import tarfile
+import time
+import zipfile
 from fastapi import APIRouter, UploadFile, File, HTTPException, Form
-from typing import List
+from typing import Dict, Iterator, List, Tuple, Union
+from app.core.config import settings
 from app.models.schemas import CVUploadRequest, EmbeddingResponse
-from app.services import get_embedding_service, get_vector_store_service
+from app.services import (
+    get_embedding_service,
+    get_vector_store_service,
+    get_document_store_service,
+    get_document_parser_service,
+    get_lexical_index
+)
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/cv", tags=["cv"])
@@ -15,16 +27,35 @@ async def upload_cv(
     """Upload and process CV"""
     try:
         content = await file.read()
-        text_content = content.decode('utf-8', errors='ignore')
+        text_content = await _extract_text(content, file.filename)
         
-        embedding_service = get_embedding_service()
-        vector_store = get_vector_store_service()
+        # Resolved off the event loop: the first call may wait for warmup to load the model
+        embedding_service = await asyncio.to_thread(get_embedding_service)
+        vector_store = await asyncio.to_thread(get_vector_store_service)
+        document_store = await asyncio.to_thread(get_document_store_service)
+        
+        # Store full text for the matching pipeline
+        await asyncio.to_thread(
+            document_store.put,
+            cv_id,
+            file.filename,
+            text_content,
+            {"content_type": file.content_type, "size_bytes": len(content)}
+        )
+        
+        # Index keywords for skills filtering and hybrid retrieval (the first
+        # get_lexical_index call backfills from the document store)
+        lexical_index = await asyncio.to_thread(get_lexical_index)
+        await asyncio.to_thread(
+            lexical_index.index_documents,
+            [(cv_id, text_content, document_store.content_hash(text_content))]
+        )
         
         # Generate embedding
-        embedding = embedding_service.embed_text(text_content)
+        embedding = await embedding_service.aembed_text(text_content)
         
         # Store in vector database
-        vector_store.upsert_vectors([
+        await asyncio.to_thread(vector_store.upsert_vectors, [
             (cv_id, embedding, {
                 "filename": file.filename,
                 "content": text_content[:500]  # Store first 500 chars as metadata
@@ -41,12 +72,207 @@ async def upload_cv(
         logger.error(f"Error uploading CV: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
+async def _extract_text(content: bytes, filename: str) -> str:
+    """Extract plain text from an uploaded CV file (PDF, DOCX, PPTX or text)"""
+    text_content = await get_document_parser_service().aparse(content, filename)
+    if not text_content.strip():
+        raise ValueError("No text content")
+    return text_content
+
+def _cv_id_for(filename: str) -> str:
+    """Derive a cv_id from a filename the same way the frontend does"""
+    return os.path.basename(filename).replace(".", "_")
+
+def _read_limited(stream, filename: str) -> Union[bytes, Exception]:
+    """Read at most settings.bulk_max_file_bytes, rejecting anything larger"""
+    limit = settings.bulk_max_file_bytes
+    content = stream.read(limit + 1)
+    if len(content) > limit:
+        return ValueError(f"{filename} is larger than {limit} bytes")
+    return content
+
+def _iter_uploaded_files(files: List[UploadFile]) -> Iterator[Tuple[str, Union[bytes, Exception]]]:
+    """Yield (filename, content or error) for each uploaded CV, expanding zip/tar archives one member at a time.
+    
+    Blocking: decompression happens as the iterator is advanced, so callers on
+    the event loop advance it in a worker thread. Members over
+    settings.bulk_max_file_bytes are reported instead of read, whatever size
+    the archive header claims, and at most settings.bulk_max_archive_members
+    files are read from each archive.
+    """
+    limit = settings.bulk_max_file_bytes
+    for upload in files:
+        name = upload.filename or ""
+        lowered = name.lower()
+        upload.file.seek(0)
+        if lowered.endswith(".zip"):
+            with zipfile.ZipFile(upload.file) as archive:
+                members = [info for info in archive.infolist() if not info.is_dir()]
+                for info in members[:settings.bulk_max_archive_members]:
+                    if info.file_size > limit:
+                        yield info.filename, ValueError(f"{info.filename} is larger than {limit} bytes")
+                        continue
+                    with archive.open(info) as member:
+                        yield info.filename, _read_limited(member, info.filename)
+                if len(members) > settings.bulk_max_archive_members:
+                    yield name, ValueError(
+                        f"{len(members) - settings.bulk_max_archive_members} files skipped: "
+                        f"archives may hold at most {settings.bulk_max_archive_members}"
+                    )
+        elif lowered.endswith((".tar", ".tar.gz", ".tgz", ".tar.bz2")):
+            # Stream mode reads members sequentially without seeking
+            with tarfile.open(fileobj=upload.file, mode="r|*") as archive:
+                read = 0
+                for member in archive:
+                    if not member.isfile():
+                        continue
+                    if read >= settings.bulk_max_archive_members:
+                        yield name, ValueError(
+                            f"Files skipped: archives may hold at most {settings.bulk_max_archive_members}"
+                        )
+                        break
+                    read += 1
+                    if member.size > limit:
+                        yield member.name, ValueError(f"{member.name} is larger than {limit} bytes")
+                        continue
+                    yield member.name, _read_limited(archive.extractfile(member), member.name)
+        else:
+            yield name, _read_limited(upload.file, name)
+
+async def _ingest_batch(batch: List[Dict], report: List[Dict]) -> None:
+    """Embed a batch of parsed CVs together and upsert them in bounded chunks"""
+    embedding_service = await asyncio.to_thread(get_embedding_service)
+    vector_store = await asyncio.to_thread(get_vector_store_service)
+    document_store = await asyncio.to_thread(get_document_store_service)
+    try:
+        embeddings = await asyncio.to_thread(
+            embedding_service.embed_texts, [item["text"] for item in batch]
+        )
+        await asyncio.to_thread(document_store.put_many, [
+            {
+                "cv_id": item["cv_id"],
+                "filename": item["filename"],
+                "text": item["text"],
+                "metadata": {"size_bytes": item["size_bytes"]}
+            }
+            for item in batch
+        ])
+        lexical_index = await asyncio.to_thread(get_lexical_index)
+        await asyncio.to_thread(lexical_index.index_documents, [
+            (item["cv_id"], item["text"], document_store.content_hash(item["text"]))
+            for item in batch
+        ])
+        vectors = [
+            (item["cv_id"], embedding, {
+                "filename": item["filename"],
+                "content": item["text"][:500]  # Store first 500 chars as metadata
+            })
+            for item, embedding in zip(batch, embeddings)
+        ]
+        chunk_size = settings.bulk_upsert_chunk_size
+        for start in range(0, len(vectors), chunk_size):
+            await asyncio.to_thread(vector_store.upsert_vectors, vectors[start:start + chunk_size])
+        report.extend(
+            {"filename": item["filename"], "cv_id": item["cv_id"], "status": "ok"}
+            for item in batch
+        )
+    except Exception as e:
+        logger.error(f"Error ingesting batch of {len(batch)} CVs: {e}")
+        report.extend(
+            {"filename": item["filename"], "cv_id": item["cv_id"], "status": "error", "error": str(e)}
+            for item in batch
+        )
+
+@router.post("/bulk_upload")
+async def bulk_upload_cvs(files: List[UploadFile] = File(...)):
+    """Upload many CVs (or zip/tar archives of CVs) in one request.
+    
+    Starlette spools the whole multipart body (to disk past 1 MB) before
+    this runs. Files and archive members are then read one at a time in a
+    worker thread, size-limited by settings.bulk_max_file_bytes, and parsed
+    concurrently in the parser process pool, embedded in batches of settings.bulk_embed_batch_size and
+    upserted in chunks of settings.bulk_upsert_chunk_size, so only one
+    batch of files is held in memory at once.
+    """
+    async def parse_and_ingest(raw: List[Tuple[str, bytes]], report: List[Dict]) -> None:
+        texts = await asyncio.gather(
+            *(_extract_text(content, filename) for filename, content in raw),
+            return_exceptions=True
+        )
+        batch = []
+        for (filename, content), text_content in zip(raw, texts):
+            if isinstance(text_content, Exception):
+                report.append({
+                    "filename": filename,
+                    "cv_id": _cv_id_for(filename),
+                    "status": "error",
+                    "error": str(text_content)
+                })
+                continue
+            batch.append({
+                "cv_id": _cv_id_for(filename),
+                "filename": os.path.basename(filename),
+                "text": text_content,
+                "size_bytes": len(content)
+            })
+        if batch:
+            await _ingest_batch(batch, report)
+    
+    try:
+        started = time.perf_counter()
+        report: List[Dict] = []
+        raw: List[Tuple[str, bytes]] = []
+        seen: Dict[str, str] = {}  # cv_id -> first file that used it
+        
+        # Decompress in a worker thread, one member per step, off the event loop
+        uploaded = _iter_uploaded_files(files)
+        while True:
+            item = await asyncio.to_thread(next, uploaded, None)
+            if item is None:
+                break
+            filename, content = item
+            cv_id = _cv_id_for(filename)
+            if not isinstance(content, Exception) and cv_id in seen:
+                # Same basename in different archive folders would overwrite each other
+                content = ValueError(f"Duplicate cv_id {cv_id}: already used by {seen[cv_id]} in this upload")
+            if isinstance(content, Exception):
+                report.append({
+                    "filename": filename,
+                    "cv_id": cv_id,
+                    "status": "error",
+                    "error": str(content)
+                })
+                continue
+            seen[cv_id] = filename
+            raw.append((filename, content))
+            if len(raw) >= settings.bulk_embed_batch_size:
+                await parse_and_ingest(raw, report)
+                raw = []
+        if raw:
+            await parse_and_ingest(raw, report)
+        
+        elapsed = time.perf_counter() - started
+        succeeded = sum(1 for item in report if item["status"] == "ok")
+        logger.info(f"Bulk upload: {succeeded}/{len(report)} CVs in {elapsed:.2f}s")
+        return {
+            "message": "Bulk upload completed",
+            "total": len(report),
+            "succeeded": succeeded,
+            "failed": len(report) - succeeded,
+            "elapsed_seconds": round(elapsed, 3),
+            "cvs_per_second": round(succeeded / elapsed, 2) if elapsed > 0 else 0.0,
+            "results": report
+        }
+    except Exception as e:
+        logger.error(f"Error in bulk upload: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.post("/embedding", response_model=EmbeddingResponse)
 async def get_embedding(text: str):
     """Get embedding for text"""
     try:
-        embedding_service = get_embedding_service()
-        embedding = embedding_service.embed_text(text)
+        embedding_service = await asyncio.to_thread(get_embedding_service)
+        embedding = await embedding_service.aembed_text(text)
         
         return EmbeddingResponse(
             embedding=embedding,
@@ -60,9 +286,9 @@ async def get_embedding(text: str):
 async def list_cvs():
     """List all stored CVs"""
     try:
-        vector_store = get_vector_store_service()
-        # This is a simplified version - Pinecone doesn't have direct list operation
-        return {"message": "CV listing requires Pinecone metadata filtering"}
+        document_store = await asyncio.to_thread(get_document_store_service)
+        cvs = await asyncio.to_thread(document_store.list_documents)
+        return {"total": len(cvs), "cvs": cvs}
     except Exception as e:
         logger.error(f"Error listing CVs: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -71,8 +297,12 @@ async def list_cvs():
 async def delete_cv(cv_id: str):
     """Delete a CV"""
     try:
-        vector_store = get_vector_store_service()
-        vector_store.delete_vector(cv_id)
+        vector_store = await asyncio.to_thread(get_vector_store_service)
+        await asyncio.to_thread(vector_store.delete_vector, cv_id)
+        document_store = await asyncio.to_thread(get_document_store_service)
+        await asyncio.to_thread(document_store.delete, cv_id)
+        lexical_index = await asyncio.to_thread(get_lexical_index)
+        await asyncio.to_thread(lexical_index.delete, cv_id)
         
         return {"message": f"CV {cv_id} deleted successfully"}
     except Exception as e:
@@ -1,63 +1,275 @@
 import logging
-from fastapi import APIRouter, HTTPException
-from app.models.schemas import JDRequest, MatchingRequest, MatchingResponse, MatchResult
+import asyncio
+import json
+from typing import Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.models.schemas import (
+    JDRequest,
+    MatchingRequest,
+    MatchingResponse,
+    MatchResult,
+    MatchingJobSubmitted,
+    MatchingJobResponse
+)
+from app.core.config import settings
 from app.core.rag_orchestrator import get_rag_orchestrator
-from app.services import get_vector_store_service
+from app.core.job_queue import get_matching_job_queue
+from app.core.prompts import SCORING_PROMPT_VERSION, BATCH_SCORING_PROMPT_VERSION
+from app.services import (
+    get_vector_store_service,
+    get_document_store_service,
+    get_llm_router,
+    get_job_store,
+    get_match_run_store,
+    get_single_flight_stats,
+    MatchRunStore
+)
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/matching", tags=["matching"])
 
+async def _load_cv_documents(cv_ids: List[str]) -> Dict[str, Dict]:
+    """Load all CV documents in one pass, skipping unknown ids"""
+    documents = await asyncio.to_thread(get_document_store_service().get_many, cv_ids)
+    missing = [cv_id for cv_id in cv_ids if cv_id not in documents]
+    if missing:
+        logger.warning(f"Skipping {len(missing)} CVs not found in document store: {missing}")
+    return {cv_id: documents[cv_id] for cv_id in cv_ids if cv_id in documents}
+
+def _run_key(request: MatchingRequest) -> Optional[str]:
+    """Saved-run key for the JD and scoring settings (None when incremental matching is off)"""
+    if not settings.incremental_matching:
+        return None
+    return MatchRunStore.run_key(
+        request.jd.model_dump(),
+        {
+            "llm_provider": request.llm_provider,
+            "similarity_threshold": (
+                settings.similarity_threshold if request.similarity_threshold is None
+                else request.similarity_threshold
+            ),
+            "llm_top_m": settings.llm_top_m if request.llm_top_m is None else request.llm_top_m,
+            "prompt_version": (
+                BATCH_SCORING_PROMPT_VERSION if settings.llm_batch_scoring else SCORING_PROMPT_VERSION
+            )
+        }
+    )
+
+async def _saved_results(
+    run_key: Optional[str],
+    request: MatchingRequest,
+    documents: Dict[str, Dict]
+) -> Dict[str, MatchResult]:
+    """Results from the last run of this JD for CVs whose text hasn't changed since"""
+    if run_key is None or not request.incremental or not documents:
+        return {}
+    try:
+        saved = await asyncio.to_thread(get_match_run_store().get_results, run_key, list(documents))
+        return {
+            cv_id: MatchResult(**result)
+            for cv_id, result in saved.items()
+            if result.get("content_hash") == documents[cv_id]["content_hash"]
+        }
+    except Exception as e:
+        # Saved runs are an optimisation; fall back to scoring every CV
+        logger.error(f"Error loading saved match run: {e}")
+        return {}
+
+async def _save_results(run_key: Optional[str], request: MatchingRequest, matches: List[MatchResult]) -> None:
+    """Merge newly scored CVs into the saved run"""
+    if run_key is None or not matches:
+        return
+    try:
+        await asyncio.to_thread(
+            get_match_run_store().save_results,
+            run_key,
+            request.jd.job_title,
+            [match.model_dump(mode="json") for match in matches]
+        )
+    except Exception as e:
+        logger.error(f"Error saving match run: {e}")
+
+def _build_response(
+    request: MatchingRequest,
+    matches: List[MatchResult],
+    cvs_scored: Optional[int] = None
+) -> MatchingResponse:
+    """Sort LLM-scored CVs first, then by match score (ties broken by cv_id), and keep top K"""
+    matches = sorted(matches, key=lambda x: (not x.llm_scored, -x.match_score, x.cv_id))
+    top_matches = matches[:request.top_k]
+    return MatchingResponse(
+        job_title=request.jd.job_title,
+        total_cvs_matched=len(top_matches),
+        matches=top_matches,
+        cvs_scored=cvs_scored,
+        timestamp=datetime.utcnow()
+    )
+
+def _timestamp(value: Optional[float]) -> Optional[datetime]:
+    return datetime.utcfromtimestamp(value) if value else None
+
 @router.post("/match", response_model=MatchingResponse)
 async def match_cvs(request: MatchingRequest):
     """Match CVs against job description"""
     try:
         logger.info(f"Starting matching for job: {request.jd.job_title}")
         
-        orchestrator = get_rag_orchestrator()
-        vector_store = get_vector_store_service()
+        # First use builds the orchestrator (model, stores, lexical backfill) off the event loop
+        orchestrator = await asyncio.to_thread(get_rag_orchestrator)
+        documents = await _load_cv_documents(request.cv_ids)
+        run_key = _run_key(request)
+        reused = await _saved_results(run_key, request, documents)
+        if reused:
+            logger.info(f"Reusing {len(reused)} saved results; scoring {len(documents) - len(reused)} new or changed CVs")
         
-        # Process each CV
         matches = []
+        if len(reused) < len(documents):
+            # Run RAG pipelines concurrently
+            states = await orchestrator.process_many(
+                job_description=request.jd.job_description,
+                job_title=request.jd.job_title,
+                cv_texts={cv_id: doc["text"] for cv_id, doc in documents.items()},
+                llm_provider=request.llm_provider,
+                similarity_threshold=request.similarity_threshold,
+                llm_top_m=request.llm_top_m,
+                skip_cv_ids=set(reused),
+                required_skills=request.jd.required_skills
+            )
+            matches = [state.match_result for state in states if state.match_result]
+            await _save_results(run_key, request, matches)
         
-        for cv_id in request.cv_ids:
-            try:
-                # Get CV from vector store (this would need actual retrieval implementation)
-                # For now, using mock data structure
-                cv_text = f"CV content for {cv_id}"  # Placeholder
-                
-                # Run RAG pipeline
-                result = orchestrator.process(
-                    job_description=request.jd.job_description,
-                    job_title=request.jd.job_title,
-                    cv_id=cv_id,
-                    cv_text=cv_text
-                )
-                
-                if result.match_result:
-                    matches.append(result.match_result)
-            except Exception as e:
-                logger.error(f"Error processing CV {cv_id}: {e}")
-                continue
-        
-        # Sort by match score and return top K
-        matches.sort(key=lambda x: x.match_score, reverse=True)
-        top_matches = matches[:request.top_k]
+        response = _build_response(request, list(reused.values()) + matches, cvs_scored=len(matches))
         
-        response = MatchingResponse(
-            job_title=request.jd.job_title,
-            total_cvs_matched=len(top_matches),
-            matches=top_matches,
-            timestamp=datetime.utcnow()
-        )
-        
-        logger.info(f"Matching completed. Found {len(top_matches)} matches")
+        logger.info(f"Matching completed. Found {response.total_cvs_matched} matches")
         return response
         
     except Exception as e:
         logger.error(f"Error in matching: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/match/stream")
+async def match_cvs_stream(request: MatchingRequest):
+    """Match CVs against job description, streaming results as NDJSON.
+
+    Emits one {"type": "result"} frame per CV as soon as its pipeline
+    finishes, then a final {"type": "summary"} frame holding the sorted
+    top-k MatchingResponse. CVs reused from the saved run of this JD are
+    emitted first with "reused": true. Failures after the stream has
+    started are reported as an {"type": "error"} frame.
+    """
+    try:
+        logger.info(f"Starting streamed matching for job: {request.jd.job_title}")
+        orchestrator = await asyncio.to_thread(get_rag_orchestrator)
+        documents = await _load_cv_documents(request.cv_ids)
+        run_key = _run_key(request)
+        reused = await _saved_results(run_key, request, documents)
+    except Exception as e:
+        logger.error(f"Error in matching: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def frames():
+        matches = []
+        completed = 0
+        total = len(documents)
+        try:
+            for cv_id, match in reused.items():
+                completed += 1
+                yield json.dumps({
+                    "type": "result",
+                    "cv_id": cv_id,
+                    "completed": completed,
+                    "total": total,
+                    "reused": True,
+                    "match": match.model_dump(mode="json")
+                }) + "\n"
+            
+            if len(reused) < total:
+                async for cv_id, state in orchestrator.iter_process_many(
+                    job_description=request.jd.job_description,
+                    job_title=request.jd.job_title,
+                    cv_texts={cv_id: doc["text"] for cv_id, doc in documents.items()},
+                    llm_provider=request.llm_provider,
+                    similarity_threshold=request.similarity_threshold,
+                    llm_top_m=request.llm_top_m,
+                    skip_cv_ids=set(reused),
+                    required_skills=request.jd.required_skills
+                ):
+                    completed += 1
+                    frame = {"type": "result", "cv_id": cv_id, "completed": completed, "total": total}
+                    if state is not None and state.match_result:
+                        matches.append(state.match_result)
+                        frame["match"] = state.match_result.model_dump(mode="json")
+                    else:
+                        frame["error"] = (state.error if state is not None else None) or "CV could not be scored"
+                    yield json.dumps(frame) + "\n"
+                await _save_results(run_key, request, matches)
+
+            summary = _build_response(request, list(reused.values()) + matches, cvs_scored=len(matches))
+            yield json.dumps({"type": "summary", **summary.model_dump(mode="json")}) + "\n"
+            logger.info(f"Streamed matching completed. Found {summary.total_cvs_matched} matches")
+        except Exception as e:
+            logger.error(f"Error in streamed matching: {e}")
+            yield json.dumps({"type": "error", "detail": str(e)}) + "\n"
+
+    return StreamingResponse(frames(), media_type="application/x-ndjson")
+
+@router.post("/jobs", response_model=MatchingJobSubmitted, status_code=202)
+async def submit_matching_job(request: MatchingRequest):
+    """Queue a matching job and return its id immediately.
+
+    Background workers run the pipeline and persist each CV's result as it
+    finishes; poll GET /api/matching/jobs/{job_id} for progress and results.
+    """
+    try:
+        job_id = await get_matching_job_queue().submit(request.model_dump(mode="json"))
+        logger.info(f"Queued matching job {job_id} for {len(request.cv_ids)} CVs: {request.jd.job_title}")
+        return MatchingJobSubmitted(job_id=job_id, status="queued", total=len(request.cv_ids))
+    except Exception as e:
+        logger.error(f"Error queueing matching job: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/jobs/{job_id}", response_model=MatchingJobResponse)
+async def get_matching_job(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000)
+):
+    """Job status, progress and a page of results ranked like /match (partial while running)"""
+    store = get_job_store()
+    job = await asyncio.to_thread(store.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    limit = limit or settings.match_job_page_size
+    results = await asyncio.to_thread(store.get_results, job_id, offset, limit)
+    return MatchingJobResponse(
+        job_id=job_id,
+        status=job["status"],
+        job_title=job["request"]["jd"]["job_title"],
+        total=job["total"],
+        completed=job["completed"],
+        failed=job["failed"],
+        error=job["error"],
+        created_at=_timestamp(job["created_at"]),
+        started_at=_timestamp(job["started_at"]),
+        finished_at=_timestamp(job["finished_at"]),
+        offset=offset,
+        limit=limit,
+        total_matches=job["completed"] - job["failed"],
+        matches=[MatchResult(**result) for result in results]
+    )
+
+@router.get("/router/stats")
+async def router_stats():
+    """Per-provider latency, error and routing metrics for llm_provider=auto"""
+    return get_llm_router().get_stats()
+
+@router.get("/coalescing/stats")
+async def coalescing_stats():
+    """Single-flight counters: identical in-flight embeddings and LLM scorings that were shared"""
+    return get_single_flight_stats()
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -1,15 +1,54 @@
 from .embedding_service import EmbeddingService, get_embedding_service
+from .embedding_cache import EmbeddingCache
 from .vector_store_service import VectorStoreService, get_vector_store_service
-from .llm_service import LLMService, get_llm_service
+from .local_vector_store import LocalVectorStoreService
+from .llm_service import LLMService, get_llm_service, get_llm_client, register_llm_client
+from .llm_router import LLMRouter, get_llm_router
+from .llm_cache import LLMResponseCache, get_llm_response_cache
 from .observability_service import ObservabilityService, get_observability_service
+from .document_store import DocumentStoreService, get_document_store_service
+from .document_parser import (
+    DocumentParserService,
+    get_document_parser_service,
+    shutdown_document_parser_service
+)
+from .metrics_service import MetricsRegistry, render_metrics
+from .job_store import MatchingJobStore, get_job_store
+from .match_run_store import MatchRunStore, get_match_run_store
+from .lexical_index import LexicalIndex, get_lexical_index
+from .single_flight import SingleFlight, get_single_flight, get_single_flight_stats
 
 __all__ = [
     "EmbeddingService",
     "get_embedding_service",
+    "EmbeddingCache",
     "VectorStoreService",
     "get_vector_store_service",
+    "LocalVectorStoreService",
     "LLMService",
     "get_llm_service",
+    "get_llm_client",
+    "register_llm_client",
+    "LLMRouter",
+    "get_llm_router",
+    "LLMResponseCache",
+    "get_llm_response_cache",
     "ObservabilityService",
-    "get_observability_service"
+    "get_observability_service",
+    "DocumentStoreService",
+    "get_document_store_service",
+    "DocumentParserService",
+    "get_document_parser_service",
+    "shutdown_document_parser_service",
+    "MetricsRegistry",
+    "render_metrics",
+    "MatchingJobStore",
+    "get_job_store",
+    "MatchRunStore",
+    "get_match_run_store",
+    "SingleFlight",
+    "get_single_flight",
+    "get_single_flight_stats",
+    "LexicalIndex",
+    "get_lexical_index"
 ]
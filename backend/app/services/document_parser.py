@@ -0,0 +1,212 @@
+import asyncio
+import hashlib
+import io
+import logging
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Set
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def detect_format(content: bytes, filename: Optional[str] = None) -> str:
+    """Detect the document format from magic bytes, falling back to the extension"""
+    if content.startswith(b"%PDF"):
+        return "pdf"
+    if content.startswith(b"PK\x03\x04"):
+        try:
+            with zipfile.ZipFile(io.BytesIO(content)) as archive:
+                names = set(archive.namelist())
+            if "word/document.xml" in names:
+                return "docx"
+            if "ppt/presentation.xml" in names:
+                return "pptx"
+        except zipfile.BadZipFile:
+            pass
+    extension = (filename or "").lower().rsplit(".", 1)[-1]
+    if extension in ("pdf", "docx", "pptx"):
+        return extension
+    return "text"
+
+
+def _parse_pdf(content: bytes) -> str:
+    from PyPDF2 import PdfReader
+    reader = PdfReader(io.BytesIO(content))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _parse_docx(content: bytes) -> str:
+    from docx import Document
+    document = Document(io.BytesIO(content))
+    lines = [paragraph.text for paragraph in document.paragraphs]
+    for table in document.tables:
+        for row in table.rows:
+            lines.append(" | ".join(cell.text for cell in row.cells))
+    return "\n".join(lines)
+
+
+def _parse_pptx(content: bytes) -> str:
+    from pptx import Presentation
+    presentation = Presentation(io.BytesIO(content))
+    lines = []
+    for slide in presentation.slides:
+        for shape in slide.shapes:
+            if shape.has_text_frame:
+                lines.append(shape.text_frame.text)
+    return "\n".join(lines)
+
+
+PARSERS = {
+    "pdf": _parse_pdf,
+    "docx": _parse_docx,
+    "pptx": _parse_pptx
+}
+
+
+def parse_document(content: bytes, fmt: str) -> str:
+    """Extract text from a document (runs inside a worker process)"""
+    if fmt in PARSERS:
+        return PARSERS[fmt](content)
+    return content.decode("utf-8", errors="ignore")
+
+
+class DocumentParserService:
+    """Extracts CV text from PDF, DOCX, PPTX and plain-text uploads.
+
+    Binary formats are parsed in a process pool so CPU-heavy parsing never
+    runs on the event loop. At most ``parser_workers`` parses are submitted
+    at once, so the ``parser_timeout`` clock only covers time spent parsing,
+    not time queued behind other files. A timed-out parse retires the pool:
+    new parses go to a fresh pool, and the old pool's workers are killed
+    once the other parses still running on it have finished. Parsed text is
+    cached in memory by SHA-256 of the file bytes.
+    """
+
+    def __init__(self):
+        self.max_workers = settings.parser_workers
+        self.timeout = settings.parser_timeout
+        self.cache_size = settings.parser_cache_size
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Parses still expected to finish, per pool (timed-out ones excluded)
+        self._active: Dict[ProcessPoolExecutor, int] = {}
+        self._retired: Set[ProcessPoolExecutor] = set()
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.timeouts = 0
+
+    def _cached(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._cache.get(key)
+            if text is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+            return text
+
+    def _remember(self, key: str, text: str) -> None:
+        with self._lock:
+            self._cache[key] = text
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _retire_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Send new parses to a fresh pool; kill the old one once it's idle"""
+        if pool is self._pool:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._retired.add(pool)
+        self._reap(pool)
+
+    def _reap(self, pool: ProcessPoolExecutor) -> None:
+        """Kill a retired pool's workers once no healthy parse is running on it"""
+        if pool not in self._retired or self._active.get(pool, 0) > 0:
+            return
+        self._retired.discard(pool)
+        self._active.pop(pool, None)
+        for process in list(getattr(pool, "_processes", {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _run_in_pool(self, content: bytes, fmt: str) -> str:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        async with self._semaphore:
+            pool = self._pool
+            self._active[pool] = self._active.get(pool, 0) + 1
+            finished = True
+            try:
+                return await asyncio.wait_for(
+                    asyncio.get_running_loop().run_in_executor(pool, parse_document, content, fmt),
+                    timeout=self.timeout
+                )
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                self._active[pool] -= 1
+                finished = False
+                self._retire_pool(pool)
+                raise
+            except BrokenProcessPool:
+                # A worker died mid-parse; stop routing new parses to this pool
+                self._retire_pool(pool)
+                raise
+            finally:
+                if finished:
+                    self._active[pool] -= 1
+                    self._reap(pool)
+
+    async def aparse(self, content: bytes, filename: Optional[str] = None) -> str:
+        """Extract text from an uploaded file without blocking the event loop"""
+        key = hashlib.sha256(content).hexdigest()
+        cached = self._cached(key)
+        if cached is not None:
+            return cached
+
+        fmt = detect_format(content, filename)
+        if fmt == "text":
+            text = parse_document(content, fmt)
+        else:
+            try:
+                text = await self._run_in_pool(content, fmt)
+            except asyncio.TimeoutError:
+                raise ValueError(f"Timed out parsing {filename or fmt} after {self.timeout}s")
+            except Exception as e:
+                logger.error(f"Error parsing {filename or fmt}: {e}")
+                raise ValueError(f"Could not parse {fmt} document: {e}")
+
+        self._remember(key, text)
+        return text
+
+    def get_stats(self) -> dict:
+        return {
+            "cache_entries": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "timeouts": self.timeouts
+        }
+
+    def shutdown(self) -> None:
+        """Stop the pool; retired pools only hold stuck parses, so kill their workers"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        for pool in list(self._retired):
+            self._active.pop(pool, None)
+            self._reap(pool)
+
+# Global instance
+document_parser_service = None
+
+def get_document_parser_service() -> DocumentParserService:
+    global document_parser_service
+    if document_parser_service is None:
+        document_parser_service = DocumentParserService()
+    return document_parser_service
+
+def shutdown_document_parser_service() -> None:
+    """Shut down the parser pools if the service was ever started"""
+    global document_parser_service
+    if document_parser_service is not None:
+        document_parser_service.shutdown()
+        document_parser_service = None
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentStoreService:
+    """Local store for full CV text and parsed metadata, keyed by cv_id.
+
+    Text is zlib-compressed in a SQLite table alongside its SHA-256 content
+    hash. ``get_many`` reads any number of CVs with one query per 500 ids.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or settings.document_store_path
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "cv_id TEXT PRIMARY KEY, filename TEXT, content BLOB, "
+                "metadata TEXT, content_hash TEXT, updated_at REAL)"
+            )
+            self._conn.commit()
+            self._lock = threading.Lock()
+            logger.info(f"Document store ready: {path}")
+        except Exception as e:
+            logger.error(f"Failed to initialize document store: {e}")
+            raise
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _row_to_document(row: tuple) -> Dict:
+        cv_id, filename, content, metadata, content_hash, updated_at = row
+        return {
+            "cv_id": cv_id,
+            "filename": filename,
+            "text": zlib.decompress(content).decode("utf-8"),
+            "metadata": json.loads(metadata) if metadata else {},
+            "content_hash": content_hash,
+            "updated_at": updated_at
+        }
+
+    def put_many(self, documents: List[Dict]) -> None:
+        """
+        Store documents
+        documents: List of dicts with cv_id, filename, text and optional metadata
+        """
+        try:
+            now = time.time()
+            rows = [
+                (
+                    doc["cv_id"],
+                    doc.get("filename"),
+                    zlib.compress(doc["text"].encode("utf-8")),
+                    json.dumps(doc.get("metadata") or {}),
+                    self.content_hash(doc["text"]),
+                    now
+                )
+                for doc in documents
+            ]
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO documents "
+                    "(cv_id, filename, content, metadata, content_hash, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.commit()
+            logger.info(f"Stored {len(rows)} documents")
+        except Exception as e:
+            logger.error(f"Error storing documents: {e}")
+            raise
+
+    def put(self, cv_id: str, filename: str, text: str, metadata: Optional[Dict] = None) -> None:
+        """Store a single document"""
+        self.put_many([{
+            "cv_id": cv_id,
+            "filename": filename,
+            "text": text,
+            "metadata": metadata
+        }])
+
+    def get_many(self, cv_ids: List[str]) -> Dict[str, Dict]:
+        """Fetch documents by cv_id (missing ids are omitted)"""
+        try:
+            documents = {}
+            with self._lock:
+                for start in range(0, len(cv_ids), 500):
+                    chunk = cv_ids[start:start + 500]
+                    rows = self._conn.execute(
+                        "SELECT cv_id, filename, content, metadata, content_hash, updated_at "
+                        f"FROM documents WHERE cv_id IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    ).fetchall()
+                    for row in rows:
+                        documents[row[0]] = self._row_to_document(row)
+            return documents
+        except Exception as e:
+            logger.error(f"Error fetching documents: {e}")
+            raise
+
+    def get(self, cv_id: str) -> Optional[Dict]:
+        """Fetch a single document"""
+        return self.get_many([cv_id]).get(cv_id)
+
+    def list_documents(self) -> List[Dict]:
+        """List stored documents without their text"""
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT cv_id, filename, content_hash, updated_at FROM documents ORDER BY cv_id"
+                ).fetchall()
+            return [
+                {"cv_id": r[0], "filename": r[1], "content_hash": r[2], "updated_at": r[3]}
+                for r in rows
+            ]
+        except Exception as e:
+            logger.error(f"Error listing documents: {e}")
+            raise
+
+    def delete(self, cv_id: str) -> None:
+        """Delete a document"""
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM documents WHERE cv_id = ?", (cv_id,))
+                self._conn.commit()
+        except Exception as e:
+            logger.error(f"Error deleting document: {e}")
+            raise
+
+# Global instance
+document_store_service = None
+
+def get_document_store_service() -> DocumentStoreService:
+    global document_store_service
+    if document_store_service is None:
+        document_store_service = DocumentStoreService()
+    return document_store_service
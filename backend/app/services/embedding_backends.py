@@ -0,0 +1,273 @@
+"""Embedding model backends for EmbeddingService.
+
+``torch``  runs the sentence-transformers model as-is.
+``onnx``   runs the same model exported to ONNX (optionally int8 dynamic
+           quantized) on onnxruntime. Vectors stay compatible with the torch
+           backend: on the built-in sample corpus the cosine similarity
+           between the two backends' vectors must be at least
+           ``settings.embedding_parity_min_cosine`` (0.98 by default for int8,
+           typically > 0.999 unquantized).
+
+Both backends expose the ``encode(texts, batch_size=...)`` subset of the
+SentenceTransformer API that EmbeddingService uses.
+
+Export, parity and throughput check (from backend/):
+    python -m app.services.embedding_backends export
+    python -m app.services.embedding_backends check [--corpus file.txt]
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_QUANTIZED_FILE = "model.int8.onnx"
+ENCODER_CONFIG_FILE = "encoder_config.json"
+
+
+def load_torch_encoder(model_name: str):
+    """Load the sentence-transformers model (imports torch on first use)"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+    if settings.embedding_torch_threads:
+        torch.set_num_threads(settings.embedding_torch_threads)
+    return SentenceTransformer(model_name)
+
+
+def _onnx_dir(model_name: str) -> str:
+    return os.path.join(settings.embedding_onnx_path, model_name.replace("/", "__"))
+
+
+def export_onnx(model_name: str, output_dir: Optional[str] = None, quantize: bool = True) -> str:
+    """Export a sentence-transformers model (transformer + pooling + normalize) to ONNX.
+
+    Needs torch, sentence-transformers and onnx; the exported encoder only
+    needs onnxruntime and tokenizers at runtime.
+    """
+    import torch
+
+    output_dir = output_dir or _onnx_dir(model_name)
+    os.makedirs(output_dir, exist_ok=True)
+    model = load_torch_encoder(model_name)
+    model.eval()
+
+    class SentenceEmbedding(torch.nn.Module):
+        def __init__(self, st_model):
+            super().__init__()
+            self.st_model = st_model
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            features = {
+                "input_ids": input_ids,
+                "attention_mask": attention_mask,
+                "token_type_ids": token_type_ids
+            }
+            return self.st_model(features)["sentence_embedding"]
+
+    sample = model.tokenizer(["warmup export"], return_tensors="pt", padding=True)
+    if "token_type_ids" not in sample:
+        sample["token_type_ids"] = torch.zeros_like(sample["input_ids"])
+    fp32_path = os.path.join(output_dir, ONNX_MODEL_FILE)
+    dynamic = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            SentenceEmbedding(model),
+            (sample["input_ids"], sample["attention_mask"], sample["token_type_ids"]),
+            fp32_path,
+            input_names=["input_ids", "attention_mask", "token_type_ids"],
+            output_names=["sentence_embedding"],
+            dynamic_axes={
+                "input_ids": dynamic,
+                "attention_mask": dynamic,
+                "token_type_ids": dynamic,
+                "sentence_embedding": {0: "batch"}
+            },
+            opset_version=17
+        )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(
+            fp32_path, os.path.join(output_dir, ONNX_QUANTIZED_FILE), weight_type=QuantType.QInt8
+        )
+
+    model.tokenizer.save_pretrained(output_dir)
+    with open(os.path.join(output_dir, ENCODER_CONFIG_FILE), "w") as f:
+        json.dump({
+            "model_name": model_name,
+            "max_seq_length": model.max_seq_length,
+            "dimension": model.get_sentence_embedding_dimension()
+        }, f)
+    logger.info(f"Exported {model_name} to ONNX at {output_dir} (quantized={quantize})")
+    return output_dir
+
+
+class OnnxSentenceEncoder:
+    """Sentence encoder backed by an exported ONNX model on onnxruntime"""
+
+    def __init__(self, model_dir: str, quantized: bool = True, num_threads: int = 0):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        with open(os.path.join(model_dir, ENCODER_CONFIG_FILE)) as f:
+            config = json.load(f)
+        self.model_name = config["model_name"]
+        self.max_seq_length = config["max_seq_length"]
+        self.dimension = config["dimension"]
+        self.quantized = quantized
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.max_seq_length)
+        self.tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = num_threads  # 0 lets onnxruntime decide
+        options.inter_op_num_threads = 1
+        model_file = ONNX_QUANTIZED_FILE if quantized else ONNX_MODEL_FILE
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        feeds = {
+            "input_ids": np.asarray([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.asarray([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.asarray([e.type_ids for e in encodings], dtype=np.int64)
+        }
+        feeds = {name: value for name, value in feeds.items() if name in self.input_names}
+        return self.session.run(None, feeds)[0].astype(np.float32)
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32, **kwargs) -> np.ndarray:
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        if not batch:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        # Sort by length so padding within a batch stays small
+        order = sorted(range(len(batch)), key=lambda i: len(batch[i]))
+        out = np.empty((len(batch), self.dimension), dtype=np.float32)
+        for start in range(0, len(order), max(1, batch_size)):
+            idx = order[start:start + batch_size]
+            out[idx] = self._encode_batch([batch[i] for i in idx])
+        return out[0] if single else out
+
+
+def load_onnx_encoder(model_name: str) -> OnnxSentenceEncoder:
+    """Load the ONNX encoder, exporting the model first if it isn't on disk yet"""
+    model_dir = _onnx_dir(model_name)
+    quantized = settings.embedding_onnx_quantize
+    model_file = ONNX_QUANTIZED_FILE if quantized else ONNX_MODEL_FILE
+    if not os.path.exists(os.path.join(model_dir, model_file)):
+        logger.info(f"No ONNX export found for {model_name}; exporting")
+        export_onnx(model_name, model_dir, quantize=quantized)
+    return OnnxSentenceEncoder(model_dir, quantized=quantized, num_threads=settings.embedding_onnx_threads)
+
+
+BACKENDS = {
+    "torch": load_torch_encoder,
+    "onnx": load_onnx_encoder
+}
+
+
+def load_encoder(backend: str, model_name: str):
+    """Load the embedding model for the given backend"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unsupported embedding backend: {backend}")
+    return BACKENDS[backend](model_name)
+
+
+def backend_id(backend: str) -> str:
+    """Identifier for vectors produced by a backend (used to namespace caches)"""
+    if backend == "onnx":
+        return "onnx-int8" if settings.embedding_onnx_quantize else "onnx"
+    return backend
+
+
+SAMPLE_CORPUS = [
+    "Senior backend engineer with 8 years of Python, FastAPI and PostgreSQL experience.",
+    "Built real-time data pipelines on Kafka and Spark processing 2TB per day.",
+    "Machine learning engineer focused on NLP, transformers and retrieval-augmented generation.",
+    "Led a team of five frontend developers shipping React and TypeScript applications.",
+    "Managed Kubernetes clusters on AWS with Terraform, Helm and GitOps workflows.",
+    "BSc in Computer Science; certified Azure Solutions Architect.",
+    "Data scientist experienced in forecasting, A/B testing and causal inference.",
+    "We are hiring a platform engineer to own CI/CD, observability and developer tooling.",
+    "Responsibilities include designing REST and gRPC APIs and mentoring junior engineers.",
+    "Fluent in English and German; published two papers on information retrieval.",
+    "Skills: Java, Spring Boot, microservices, Redis, MongoDB, Docker.",
+    "Reduced cloud spend by 35% by right-sizing instances and adopting spot capacity."
+]
+
+
+def _throughput(encoder, texts: List[str], batch_size: int) -> Dict:
+    encoder.encode(texts[:batch_size], batch_size=batch_size)  # warm caches and allocators
+    started = time.perf_counter()
+    vectors = np.asarray(encoder.encode(texts, batch_size=batch_size), dtype=np.float32)
+    elapsed = time.perf_counter() - started
+    return {"vectors": vectors, "seconds": round(elapsed, 4), "texts_per_second": round(len(texts) / elapsed, 2)}
+
+
+def compare_backends(
+    texts: Optional[List[str]] = None,
+    model_name: Optional[str] = None,
+    batch_size: int = 32,
+    repeat: int = 8
+) -> Dict:
+    """Compare the onnx backend against torch: cosine parity and throughput"""
+    model_name = model_name or settings.embedding_model
+    corpus = (texts or SAMPLE_CORPUS) * repeat
+    torch_run = _throughput(load_torch_encoder(model_name), corpus, batch_size)
+    onnx_run = _throughput(load_onnx_encoder(model_name), corpus, batch_size)
+
+    a, b = torch_run.pop("vectors"), onnx_run.pop("vectors")
+    cosines = np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+    return {
+        "model": model_name,
+        "onnx_backend": backend_id("onnx"),
+        "texts": len(corpus),
+        "torch": torch_run,
+        "onnx": onnx_run,
+        "speedup": round(torch_run["seconds"] / onnx_run["seconds"], 2),
+        "min_cosine": round(float(cosines.min()), 5),
+        "mean_cosine": round(float(cosines.mean()), 5),
+        "min_cosine_required": settings.embedding_parity_min_cosine,
+        "within_tolerance": bool(cosines.min() >= settings.embedding_parity_min_cosine)
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Export and check the ONNX embedding backend")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="export the configured model to ONNX")
+    export.add_argument("--no-quantize", action="store_true")
+    check = sub.add_parser("check", help="compare onnx against torch for parity and throughput")
+    check.add_argument("--corpus", help="text file with one sample per line")
+    check.add_argument("--batch-size", type=int, default=32)
+    check.add_argument("--repeat", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        print(export_onnx(settings.embedding_model, quantize=not args.no_quantize))
+        return
+
+    texts = None
+    if args.corpus:
+        with open(args.corpus) as f:
+            texts = [line.strip() for line in f if line.strip()]
+    report = compare_backends(texts, batch_size=args.batch_size, repeat=args.repeat)
+    print(json.dumps(report, indent=2))
+    if not report["within_tolerance"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
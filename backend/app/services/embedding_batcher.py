@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """Coalesces concurrent single-text embedding requests into batches.
+
+    Callers submit one text and get a Future back. A background thread
+    waits up to ``max_wait_ms`` after the first pending request (or until
+    ``max_batch_size`` requests are queued), runs ``encode_fn`` once on the
+    whole batch and resolves every caller's Future.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], List[List[float]]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0
+    ):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.last_batch_size = 0
+        self.largest_batch_size = 0
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="embedding-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        """Queue a text for embedding"""
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def embed(self, text: str) -> List[float]:
+        """Embed a text, blocking until its batch has run"""
+        return self.submit(text).result()
+
+    async def aembed(self, text: str) -> List[float]:
+        """Embed a text without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(text))
+
+    def _collect(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = self.encode_fn(texts)
+                for (_, future), embedding in zip(batch, embeddings):
+                    future.set_result(embedding)
+            except Exception as e:
+                logger.error(f"Error embedding batch of {len(batch)}: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            self.batches += 1
+            self.items += len(batch)
+            self.last_batch_size = len(batch)
+            self.largest_batch_size = max(self.largest_batch_size, len(batch))
+
+    def get_stats(self) -> Dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "batches": self.batches,
+            "items": self.items,
+            "last_batch_size": self.last_batch_size,
+            "largest_batch_size": self.largest_batch_size,
+            "avg_batch_size": self.items / self.batches if self.batches else 0.0
+        }
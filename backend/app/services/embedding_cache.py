@@ -0,0 +1,127 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache keyed by (model name, normalized text hash).
+
+    The memory tier is a bounded LRU; the disk tier is a SQLite table of
+    float32 blobs that survives restarts. Disk hits are promoted into the
+    memory tier.
+    """
+
+    def __init__(self, model_name: str, max_entries: int = 10000, path: Optional[str] = None):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.path = path
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._conn = None
+
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                self._conn = sqlite3.connect(path, check_same_thread=False)
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB)"
+                )
+                self._conn.commit()
+            except Exception as e:
+                logger.warning(f"Embedding disk cache disabled: {e}")
+                self._conn = None
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.split())
+
+    def key(self, text: str) -> str:
+        payload = f"{self.model_name}\0{self.normalize(text)}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+    def _remember(self, key: str, embedding: List[float]) -> None:
+        self._memory[key] = embedding
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Look up embeddings; returns None for each miss"""
+        keys = [self.key(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        with self._lock:
+            pending: Dict[str, List[int]] = {}
+            for i, key in enumerate(keys):
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    results[i] = self._memory[key]
+                    self.memory_hits += 1
+                else:
+                    pending.setdefault(key, []).append(i)
+
+            if pending and self._conn is not None:
+                try:
+                    rows = []
+                    wanted = list(pending)
+                    for start in range(0, len(wanted), 500):
+                        chunk = wanted[start:start + 500]
+                        rows.extend(self._conn.execute(
+                            "SELECT key, vector FROM embeddings WHERE key IN "
+                            f"({','.join('?' * len(chunk))})",
+                            chunk
+                        ).fetchall())
+                except Exception as e:
+                    logger.error(f"Error reading embedding cache: {e}")
+                    rows = []
+                for key, blob in rows:
+                    embedding = np.frombuffer(blob, dtype=np.float32).tolist()
+                    self._remember(key, embedding)
+                    for i in pending.pop(key):
+                        results[i] = embedding
+                        self.disk_hits += 1
+
+            self.misses += sum(len(idx) for idx in pending.values())
+        return results
+
+    def get(self, text: str) -> Optional[List[float]]:
+        return self.get_many([text])[0]
+
+    def put_many(self, texts: List[str], embeddings: List[List[float]]) -> None:
+        """Store embeddings in both tiers"""
+        items = [(self.key(text), emb) for text, emb in zip(texts, embeddings)]
+        with self._lock:
+            for key, embedding in items:
+                self._remember(key, embedding)
+            if self._conn is not None:
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                        [(key, np.asarray(emb, dtype=np.float32).tobytes()) for key, emb in items]
+                    )
+                    self._conn.commit()
+                except Exception as e:
+                    logger.error(f"Error writing embedding cache: {e}")
+
+    def put(self, text: str, embedding: List[float]) -> None:
+        self.put_many([text], [embedding])
+
+    def get_stats(self) -> Dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory)
+        }
@@ -1,27 +1,104 @@
 import logging
+import asyncio
+import threading
 from typing import List
-from sentence_transformers import SentenceTransformer
 from app.core.config import settings
+from app.services.embedding_cache import EmbeddingCache
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embedding_backends import backend_id
+from app.services.single_flight import SingleFlight, get_single_flight
 
 logger = logging.getLogger(__name__)
 
+def _load_model(model_name: str):
+    """Load the embedding model for the configured backend (torch or onnx)"""
+    from app.services.embedding_backends import load_encoder
+    return load_encoder(settings.embedding_backend, model_name)
+
 class EmbeddingService:
-    """Service for generating embeddings using sentence-transformers"""
+    """Generates text embeddings with the configured ``embedding_backend``.
+
+    The backend is sentence-transformers on torch or an exported ONNX model
+    (int8-quantized by default). Embeddings are cached in an EmbeddingCache
+    (in-memory LRU over SQLite) keyed by model, backend and text hash.
+    Identical in-flight misses are coalesced, and concurrent single-text
+    misses are micro-batched into one model pass by the EmbeddingBatcher.
+    """
     
     def __init__(self):
         try:
-            self.model = SentenceTransformer(settings.embedding_model)
+            self.model = _load_model(settings.embedding_model)
             self.dimension = settings.embedding_dimension
-            logger.info(f"Embedding model loaded: {settings.embedding_model}")
+            self.cache = None
+            if settings.embedding_cache_enabled:
+                # Backends agree only within a tolerance, so their vectors are cached apart
+                model_id = settings.embedding_model
+                if settings.embedding_backend != "torch":
+                    model_id = f"{model_id}@{backend_id(settings.embedding_backend)}"
+                self.cache = EmbeddingCache(
+                    model_id,
+                    max_entries=settings.embedding_cache_size,
+                    path=settings.embedding_cache_path
+                )
+            self.flight = get_single_flight("embedding")
+            self.batcher = None
+            if settings.embedding_batching_enabled:
+                self.batcher = EmbeddingBatcher(
+                    self._encode_batch,
+                    max_batch_size=settings.embedding_batch_max_size,
+                    max_wait_ms=settings.embedding_batch_wait_ms
+                )
+            logger.info(f"Embedding model loaded: {settings.embedding_model} ({settings.embedding_backend})")
         except Exception as e:
             logger.error(f"Failed to load embedding model: {e}")
             raise
     
+    def _encode_batch(self, texts: List[str]) -> List[List[float]]:
+        """Run one model forward pass over a batch of texts"""
+        embeddings = self.model.encode(texts, batch_size=len(texts), convert_to_tensor=False)
+        return [emb.tolist() for emb in embeddings]
+    
+    def _compute(self, text: str) -> List[float]:
+        if self.batcher:
+            embedding = self.batcher.embed(text)
+        else:
+            embedding = self.model.encode(text, convert_to_tensor=False).tolist()
+        if self.cache:
+            self.cache.put(text, embedding)
+        return embedding
+    
+    async def _acompute(self, text: str) -> List[float]:
+        if self.batcher:
+            embedding = await self.batcher.aembed(text)
+        else:
+            embedding = await asyncio.to_thread(
+                lambda: self.model.encode(text, convert_to_tensor=False).tolist()
+            )
+        if self.cache:
+            self.cache.put(text, embedding)
+        return embedding
+    
     def embed_text(self, text: str) -> List[float]:
         """Generate embedding for a single text"""
         try:
-            embedding = self.model.encode(text, convert_to_tensor=False)
-            return embedding.tolist()
+            if self.cache:
+                cached = self.cache.get(text)
+                if cached is not None:
+                    return cached
+            # Concurrent requests for the same text share one encode
+            return self.flight.do(SingleFlight.make_key(text), lambda: self._compute(text))
+        except Exception as e:
+            logger.error(f"Error generating embedding: {e}")
+            raise
+    
+    async def aembed_text(self, text: str) -> List[float]:
+        """Generate embedding for a single text without blocking the event loop"""
+        try:
+            if self.cache:
+                cached = self.cache.get(text)
+                if cached is not None:
+                    return cached
+            return await self.flight.ado(SingleFlight.make_key(text), lambda: self._acompute(text))
         except Exception as e:
             logger.error(f"Error generating embedding: {e}")
             raise
@@ -29,21 +106,56 @@ class EmbeddingService:
     def embed_texts(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for multiple texts"""
         try:
-            embeddings = self.model.encode(texts, convert_to_tensor=False)
-            return [emb.tolist() for emb in embeddings]
+            if not self.cache:
+                embeddings = self.model.encode(texts, convert_to_tensor=False)
+                return [emb.tolist() for emb in embeddings]
+            
+            results = self.cache.get_many(texts)
+            # Encode each distinct missing text once
+            missing = list(dict.fromkeys(
+                text for text, emb in zip(texts, results) if emb is None
+            ))
+            if missing:
+                computed = [
+                    emb.tolist()
+                    for emb in self.model.encode(missing, convert_to_tensor=False)
+                ]
+                self.cache.put_many(missing, computed)
+                by_text = dict(zip(missing, computed))
+                results = [
+                    emb if emb is not None else by_text[text]
+                    for text, emb in zip(texts, results)
+                ]
+            return results
         except Exception as e:
             logger.error(f"Error generating embeddings: {e}")
             raise
     
+    def warmup(self) -> None:
+        """Run one inference so the first request doesn't pay for lazy init"""
+        self._encode_batch(["warmup"])
+    
     def get_dimension(self) -> int:
         """Get embedding dimension"""
         return self.dimension
+    
+    def get_cache_stats(self) -> dict:
+        """Get embedding cache hit/miss counters"""
+        return self.cache.get_stats() if self.cache else {}
+    
+    def get_batcher_stats(self) -> dict:
+        """Get micro-batching queue depth and batch size counters"""
+        return self.batcher.get_stats() if self.batcher else {}
 
 # Global instance
 embedding_service = None
+_embedding_service_lock = threading.Lock()
 
 def get_embedding_service() -> EmbeddingService:
     global embedding_service
     if embedding_service is None:
-        embedding_service = EmbeddingService()
+        # The model load is slow; don't let warmup and a request both load it
+        with _embedding_service_lock:
+            if embedding_service is None:
+                embedding_service = EmbeddingService()
     return embedding_service
@@ -0,0 +1,202 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Set
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class MatchingJobStore:
+    """SQLite store for asynchronous matching jobs and their per-CV results.
+
+    A job row holds the original request and progress counters; each CV that
+    finishes adds a result row as it completes, so partial results are
+    readable while the job runs and survive a restart.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or settings.match_job_store_path
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, status TEXT, request TEXT, total INTEGER, "
+                "completed INTEGER DEFAULT 0, failed INTEGER DEFAULT 0, error TEXT, "
+                "created_at REAL, started_at REAL, finished_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS job_results ("
+                "job_id TEXT, cv_id TEXT, llm_scored INTEGER, match_score REAL, "
+                "result TEXT, error TEXT, PRIMARY KEY (job_id, cv_id))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+            self._conn.commit()
+            self._lock = threading.Lock()
+            logger.info(f"Matching job store ready: {path}")
+        except Exception as e:
+            logger.error(f"Failed to initialize matching job store: {e}")
+            raise
+
+    @staticmethod
+    def _row_to_job(row: tuple) -> Dict:
+        job_id, status, request, total, completed, failed, error, created_at, started_at, finished_at = row
+        return {
+            "job_id": job_id,
+            "status": status,
+            "request": json.loads(request),
+            "total": total,
+            "completed": completed,
+            "failed": failed,
+            "error": error,
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at
+        }
+
+    def create_job(self, request: Dict) -> str:
+        """Persist a new queued job and return its id"""
+        try:
+            job_id = uuid.uuid4().hex
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO jobs (job_id, status, request, total, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, QUEUED, json.dumps(request), len(request.get("cv_ids", [])), time.time())
+                )
+                self._conn.commit()
+            return job_id
+        except Exception as e:
+            logger.error(f"Error creating matching job: {e}")
+            raise
+
+    def claim_next(self) -> Optional[Dict]:
+        """Mark the oldest queued job as running and return it (None when idle)"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT job_id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ? WHERE job_id = ?",
+                    (RUNNING, time.time(), row[0])
+                )
+                self._conn.commit()
+            return self.get_job(row[0])
+        except Exception as e:
+            logger.error(f"Error claiming matching job: {e}")
+            raise
+
+    def requeue_running(self) -> int:
+        """Put jobs interrupted by a shutdown back on the queue; their results are kept"""
+        try:
+            with self._lock:
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = ? WHERE status = ?", (QUEUED, RUNNING)
+                )
+                self._conn.commit()
+            return cursor.rowcount
+        except Exception as e:
+            logger.error(f"Error requeueing matching jobs: {e}")
+            raise
+
+    def add_result(self, job_id: str, cv_id: str, result: Optional[Dict], error: Optional[str] = None) -> None:
+        """Record one CV's match result (or error) and advance the job's progress"""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO job_results "
+                    "(job_id, cv_id, llm_scored, match_score, result, error) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        job_id,
+                        cv_id,
+                        int(bool(result and result.get("llm_scored", True))),
+                        result["match_score"] if result else None,
+                        json.dumps(result) if result else None,
+                        error
+                    )
+                )
+                self._conn.execute(
+                    "UPDATE jobs SET "
+                    "completed = (SELECT COUNT(*) FROM job_results WHERE job_id = ?), "
+                    "failed = (SELECT COUNT(*) FROM job_results WHERE job_id = ? AND result IS NULL) "
+                    "WHERE job_id = ?",
+                    (job_id, job_id, job_id)
+                )
+                self._conn.commit()
+        except Exception as e:
+            logger.error(f"Error storing result for job {job_id}: {e}")
+            raise
+
+    def finish_job(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        """Mark a job completed or failed"""
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE job_id = ?",
+                    (status, error, time.time(), job_id)
+                )
+                self._conn.commit()
+        except Exception as e:
+            logger.error(f"Error finishing job {job_id}: {e}")
+            raise
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """Fetch a job's status and progress (None if unknown)"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT job_id, status, request, total, completed, failed, error, "
+                    "created_at, started_at, finished_at FROM jobs WHERE job_id = ?",
+                    (job_id,)
+                ).fetchone()
+            return self._row_to_job(row) if row else None
+        except Exception as e:
+            logger.error(f"Error fetching job {job_id}: {e}")
+            raise
+
+    def get_results(self, job_id: str, offset: int = 0, limit: int = 50) -> List[Dict]:
+        """Page through a job's matches: LLM-scored first, then by score, ties by cv_id"""
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT result FROM job_results WHERE job_id = ? AND result IS NOT NULL "
+                    "ORDER BY llm_scored DESC, match_score DESC, cv_id LIMIT ? OFFSET ?",
+                    (job_id, limit, offset)
+                ).fetchall()
+            return [json.loads(row[0]) for row in rows]
+        except Exception as e:
+            logger.error(f"Error fetching results for job {job_id}: {e}")
+            raise
+
+    def finished_cv_ids(self, job_id: str) -> Set[str]:
+        """CVs that already have a result, skipped when a job resumes"""
+        try:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT cv_id FROM job_results WHERE job_id = ?", (job_id,)
+                ).fetchall()
+            return {row[0] for row in rows}
+        except Exception as e:
+            logger.error(f"Error fetching finished CVs for job {job_id}: {e}")
+            raise
+
+# Global instance
+job_store = None
+
+def get_job_store() -> MatchingJobStore:
+    global job_store
+    if job_store is None:
+        job_store = MatchingJobStore()
+    return job_store
@@ -0,0 +1,201 @@
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase keyword tokens; keeps skill spellings like c++, c# and node.js intact"""
+    return [token.rstrip(".") for token in _TOKEN.findall(text.lower()) if token.rstrip(".")]
+
+
+def skill_terms(skill: str) -> Set[str]:
+    """Terms a CV must contain to count as matching a skill"""
+    return set(tokenize(skill))
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> Dict[str, float]:
+    """Fuse ranked id lists: score(id) = sum over lists of 1 / (k + rank)"""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            fused[item] = fused.get(item, 0.0) + 1.0 / (k + rank)
+    return fused
+
+
+class LexicalIndex:
+    """Inverted keyword index over CV text with BM25 scoring.
+
+    Postings (term, cv_id, term frequency) and document lengths live in
+    SQLite next to the document store. Documents are indexed at upload and
+    re-indexed in place when their text changes; ``sync`` backfills CVs
+    stored before the index existed.
+    """
+
+    def __init__(self, path: Optional[str] = None, k1: float = 1.5, b: float = 0.75):
+        path = path or settings.lexical_index_path
+        self.k1 = k1
+        self.b = b
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS postings ("
+                "term TEXT, cv_id TEXT, tf INTEGER, PRIMARY KEY (term, cv_id)) WITHOUT ROWID"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS postings_cv ON postings (cv_id)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "cv_id TEXT PRIMARY KEY, length INTEGER, content_hash TEXT)"
+            )
+            self._conn.commit()
+            self._lock = threading.Lock()
+            logger.info(f"Lexical index ready: {path}")
+        except Exception as e:
+            logger.error(f"Failed to initialize lexical index: {e}")
+            raise
+
+    def index_documents(self, documents: List[Tuple[str, str, Optional[str]]]) -> None:
+        """
+        Add or re-index documents
+        documents: List of (cv_id, text, content_hash) tuples
+        """
+        try:
+            with self._lock:
+                for cv_id, text, content_hash in documents:
+                    terms = Counter(tokenize(text))
+                    self._conn.execute("DELETE FROM postings WHERE cv_id = ?", (cv_id,))
+                    self._conn.executemany(
+                        "INSERT INTO postings (term, cv_id, tf) VALUES (?, ?, ?)",
+                        [(term, cv_id, tf) for term, tf in terms.items()]
+                    )
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO documents (cv_id, length, content_hash) VALUES (?, ?, ?)",
+                        (cv_id, sum(terms.values()), content_hash)
+                    )
+                self._conn.commit()
+            logger.info(f"Indexed {len(documents)} documents for keyword search")
+        except Exception as e:
+            logger.error(f"Error indexing documents: {e}")
+            raise
+
+    def delete(self, cv_id: str) -> None:
+        """Remove a document from the index"""
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM postings WHERE cv_id = ?", (cv_id,))
+                self._conn.execute("DELETE FROM documents WHERE cv_id = ?", (cv_id,))
+                self._conn.commit()
+        except Exception as e:
+            logger.error(f"Error deleting {cv_id} from lexical index: {e}")
+            raise
+
+    def sync(self, document_store) -> int:
+        """Index stored CVs that are missing or whose text changed; returns how many"""
+        try:
+            with self._lock:
+                indexed = dict(self._conn.execute("SELECT cv_id, content_hash FROM documents").fetchall())
+            stale = [
+                doc["cv_id"] for doc in document_store.list_documents()
+                if indexed.get(doc["cv_id"]) != doc["content_hash"]
+            ]
+            for start in range(0, len(stale), 500):
+                documents = document_store.get_many(stale[start:start + 500])
+                self.index_documents([
+                    (cv_id, doc["text"], doc["content_hash"]) for cv_id, doc in documents.items()
+                ])
+            return len(stale)
+        except Exception as e:
+            logger.error(f"Error syncing lexical index: {e}")
+            raise
+
+    def _postings(self, terms: Iterable[str], cv_ids: Optional[List[str]]) -> List[tuple]:
+        terms = list(set(terms))
+        if not terms:
+            return []
+        query = (
+            "SELECT p.term, p.cv_id, p.tf, d.length FROM postings p JOIN documents d ON d.cv_id = p.cv_id "
+            f"WHERE p.term IN ({','.join('?' * len(terms))})"
+        )
+        if cv_ids is None:
+            return self._conn.execute(query, terms).fetchall()
+        rows = []
+        for start in range(0, len(cv_ids), 500):
+            chunk = cv_ids[start:start + 500]
+            rows.extend(self._conn.execute(
+                query + f" AND p.cv_id IN ({','.join('?' * len(chunk))})", [*terms, *chunk]
+            ).fetchall())
+        return rows
+
+    def search(self, query: str, top_k: int = 10, cv_ids: Optional[List[str]] = None) -> List[Tuple[str, float]]:
+        """BM25 scores for the query's terms, highest first (optionally only among cv_ids)"""
+        try:
+            terms = set(tokenize(query))
+            with self._lock:
+                doc_count, total_length = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(length), 0) FROM documents"
+                ).fetchone()
+                if not doc_count or not terms:
+                    return []
+                document_frequency = dict(self._conn.execute(
+                    f"SELECT term, COUNT(*) FROM postings WHERE term IN ({','.join('?' * len(terms))}) "
+                    "GROUP BY term",
+                    list(terms)
+                ).fetchall())
+                rows = self._postings(terms, cv_ids)
+            average_length = total_length / doc_count or 1.0
+            scores: Dict[str, float] = {}
+            for term, cv_id, tf, length in rows:
+                df = document_frequency[term]
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                norm = tf + self.k1 * (1 - self.b + self.b * length / average_length)
+                scores[cv_id] = scores.get(cv_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+            return ranked[:top_k] if top_k else ranked
+        except Exception as e:
+            logger.error(f"Error searching lexical index: {e}")
+            raise
+
+    def match_skills(self, skills: List[str], cv_ids: List[str]) -> Dict[str, List[str]]:
+        """For each CV, the skills whose terms all appear in its text (CVs with none are omitted)"""
+        try:
+            wanted = {skill: skill_terms(skill) for skill in skills if skill_terms(skill)}
+            with self._lock:
+                rows = self._postings(set().union(*wanted.values()) if wanted else [], cv_ids)
+            present: Dict[str, Set[str]] = {}
+            for term, cv_id, _, _ in rows:
+                present.setdefault(cv_id, set()).add(term)
+            return {
+                cv_id: [skill for skill, terms in wanted.items() if terms <= cv_terms]
+                for cv_id, cv_terms in present.items()
+                if any(terms <= cv_terms for terms in wanted.values())
+            }
+        except Exception as e:
+            logger.error(f"Error matching skills: {e}")
+            raise
+
+# Global instance
+lexical_index = None
+_lexical_index_lock = threading.Lock()
+
+def get_lexical_index() -> LexicalIndex:
+    global lexical_index
+    if lexical_index is None:
+        with _lexical_index_lock:
+            if lexical_index is None:
+                from app.services.document_store import get_document_store_service
+                index = LexicalIndex()
+                backfilled = index.sync(get_document_store_service())
+                if backfilled:
+                    logger.info(f"Backfilled {backfilled} CVs into the lexical index")
+                lexical_index = index
+    return lexical_index
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    """Persistent cache of parsed LLM scoring responses.
+
+    Entries are keyed by provider, model, prompt-template version and a hash
+    of the JD and CV text, stored in SQLite, expired after ``ttl_seconds``
+    and trimmed to ``max_entries`` by least-recent access. The latency of
+    the original call is stored with each entry so hits can report the time
+    they saved.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.saved_latency_ms = 0.0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_responses ("
+            "key TEXT PRIMARY KEY, response TEXT, latency_ms REAL, "
+            "created_at REAL, accessed_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_llm_responses_accessed "
+            "ON llm_responses (accessed_at)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        prompt_version: str,
+        job_text: str,
+        cv_text: str
+    ) -> str:
+        jd_hash = hashlib.sha256(job_text.encode("utf-8")).hexdigest()
+        cv_hash = hashlib.sha256(cv_text.encode("utf-8")).hexdigest()
+        return hashlib.sha256(
+            f"{provider}\0{model}\0{prompt_version}\0{jd_hash}\0{cv_hash}".encode("utf-8")
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached response for key, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT response, latency_ms, created_at FROM llm_responses WHERE key = ?",
+                    (key,)
+                ).fetchone()
+                if row and now - row[2] > self.ttl_seconds:
+                    self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                    self.evictions += 1
+                    row = None
+                if row is None:
+                    self.misses += 1
+                    return None
+                self._conn.execute(
+                    "UPDATE llm_responses SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+                self.hits += 1
+                self.saved_latency_ms += row[1] or 0.0
+                return json.loads(row[0])
+            except Exception as e:
+                logger.error(f"Error reading LLM cache: {e}")
+                self.misses += 1
+                return None
+
+    def put(self, key: str, response: Dict, latency_ms: float) -> None:
+        """Store a parsed response and evict down to max_entries"""
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses "
+                    "(key, response, latency_ms, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, json.dumps(response), latency_ms, now, now)
+                )
+                count = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+                if count > self.max_entries:
+                    excess = count - self.max_entries
+                    self._conn.execute(
+                        "DELETE FROM llm_responses WHERE key IN ("
+                        "SELECT key FROM llm_responses ORDER BY accessed_at LIMIT ?)",
+                        (excess,)
+                    )
+                    self.evictions += excess
+                self._conn.commit()
+            except Exception as e:
+                logger.error(f"Error writing LLM cache: {e}")
+
+    def get_stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "saved_latency_ms": self.saved_latency_ms
+        }
+
+
+# Global instance
+llm_response_cache = None
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """Get the shared LLM response cache, or None when disabled"""
+    global llm_response_cache
+    if llm_response_cache is None and settings.llm_cache_enabled:
+        llm_response_cache = LLMResponseCache(
+            settings.llm_cache_path,
+            ttl_seconds=settings.llm_cache_ttl_seconds,
+            max_entries=settings.llm_cache_max_entries
+        )
+    return llm_response_cache
@@ -0,0 +1,279 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from app.core.config import settings
+from app.services.metrics_service import LLM_ROUTER_CALLS, LLM_ROUTER_COOLDOWNS
+
+logger = logging.getLogger(__name__)
+
+
+def _is_rate_limit(error: Exception) -> bool:
+    """True for provider 429 / rate-limit errors (OpenAI and Anthropic SDKs)"""
+    return getattr(error, "status_code", None) == 429 or "ratelimit" in type(error).__name__.lower()
+
+
+class ProviderHealth:
+    """Rolling latency and error statistics for one LLM provider"""
+
+    def __init__(self, provider: str, window: int):
+        self.provider = provider
+        self.samples = deque(maxlen=window)  # (latency_ms, ok)
+        self.ewma_latency_ms: Optional[float] = None
+        self.consecutive_errors = 0
+        self.cooldown_until = 0.0
+        self.routed = 0
+        self.calls = 0
+        self.errors = 0
+        self.rate_limited = 0
+        self.timeouts = 0
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+    def latency_percentile(self, q: float) -> Optional[float]:
+        latencies = sorted(latency for latency, ok in self.samples if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def record_success(self, latency_ms: float) -> None:
+        self.calls += 1
+        self.samples.append((latency_ms, True))
+        self.consecutive_errors = 0
+        if self.ewma_latency_ms is None:
+            self.ewma_latency_ms = latency_ms
+        else:
+            alpha = settings.llm_router_ewma_alpha
+            self.ewma_latency_ms = alpha * latency_ms + (1 - alpha) * self.ewma_latency_ms
+
+    def record_failure(self, latency_ms: float, error: Exception) -> None:
+        self.calls += 1
+        self.errors += 1
+        self.samples.append((latency_ms, False))
+        self.consecutive_errors += 1
+        now = time.monotonic()
+        if isinstance(error, asyncio.TimeoutError):
+            self.timeouts += 1
+        if _is_rate_limit(error):
+            self.rate_limited += 1
+            self.cooldown_until = now + settings.llm_router_rate_limit_cooldown
+            LLM_ROUTER_COOLDOWNS.inc(provider=self.provider, reason="rate_limit")
+        elif (
+            self.consecutive_errors >= settings.llm_router_max_consecutive_errors
+            or (len(self.samples) >= 5 and self.error_rate > settings.llm_router_max_error_rate)
+        ):
+            if now >= self.cooldown_until:
+                LLM_ROUTER_COOLDOWNS.inc(provider=self.provider, reason="errors")
+            self.cooldown_until = now + settings.llm_router_error_cooldown
+
+    def to_dict(self, now: float) -> Dict:
+        p50 = self.latency_percentile(0.5)
+        p95 = self.latency_percentile(0.95)
+        return {
+            "healthy": self.healthy(now),
+            "cooldown_remaining_s": round(max(0.0, self.cooldown_until - now), 2),
+            "routed": self.routed,
+            "calls": self.calls,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "timeouts": self.timeouts,
+            "error_rate": round(self.error_rate, 4),
+            "ewma_latency_ms": round(self.ewma_latency_ms, 2) if self.ewma_latency_ms is not None else None,
+            "p50_latency_ms": round(p50, 2) if p50 is not None else None,
+            "p95_latency_ms": round(p95, 2) if p95 is not None else None
+        }
+
+
+class LLMRouter:
+    """Routes LLM calls to the fastest healthy provider, failing over on errors.
+
+    Selected with ``llm_provider="auto"``. Providers are ranked by the EWMA
+    of their recent latencies; providers without samples rank first so they
+    get probed. A provider that is rate limited or keeps failing is put in
+    cooldown and skipped until it expires. With hedging enabled, a second
+    provider is started when the first has not answered within its p95
+    latency (or ``llm_hedge_delay_ms`` until enough samples exist), and the
+    first successful answer wins.
+
+    Exposes the same ``provider``/``model_name``/``invoke``/``ainvoke``
+    surface as LLMService so the orchestrator can use either.
+    """
+
+    provider = "auto"
+
+    def __init__(self, providers: Optional[List[str]] = None):
+        names = providers or [p.strip().lower() for p in settings.llm_router_providers.split(",")]
+        self.providers = [p for p in names if p]
+        self._health = {p: ProviderHealth(p, settings.llm_router_window) for p in self.providers}
+        self._lock = threading.Lock()
+        self.failovers = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @property
+    def model_name(self) -> str:
+        # Stable across routing decisions so cached responses are shared
+        return "router:" + ",".join(self.providers)
+
+    @staticmethod
+    def _is_allowed(provider: str) -> bool:
+        """A provider is routable when it has credentials or a registered client"""
+        from app.services.llm_service import _llm_clients
+        if provider in _llm_clients:
+            return True
+        return bool(getattr(settings, f"{provider}_api_key", None))
+
+    def rank(self) -> List[str]:
+        """Allowed providers, healthy ones first, fastest first"""
+        now = time.monotonic()
+        with self._lock:
+            allowed = [p for p in self.providers if self._is_allowed(p)]
+            healthy = [p for p in allowed if self._health[p].healthy(now)]
+            healthy.sort(key=lambda p: self._health[p].ewma_latency_ms or 0.0)
+            # If everything is cooling down, try the one that recovers first
+            cooling = sorted(
+                (p for p in allowed if p not in healthy),
+                key=lambda p: self._health[p].cooldown_until
+            )
+        return healthy + cooling
+
+    def _hedge_delay(self, provider: str) -> float:
+        health = self._health[provider]
+        p95 = health.latency_percentile(0.95)
+        if p95 is None or len(health.samples) < 10:
+            p95 = settings.llm_hedge_delay_ms
+        return max(p95, settings.llm_hedge_delay_ms) / 1000
+
+    def _record(self, provider: str, started: float, error: Optional[Exception] = None) -> None:
+        latency_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            if error is None:
+                self._health[provider].record_success(latency_ms)
+            else:
+                self._health[provider].record_failure(latency_ms, error)
+
+    async def _acall(self, provider: str, prompt: str) -> str:
+        from app.services.llm_service import get_llm_service
+        started = time.perf_counter()
+        try:
+            response = await get_llm_service(provider).ainvoke(prompt)
+        except asyncio.CancelledError:
+            # Lost a hedge race or the whole call was cancelled. Only a call that
+            # outlived its hedge delay says something about the provider, so
+            # count that as a timeout and ignore shorter ones
+            if time.perf_counter() - started >= self._hedge_delay(provider):
+                self._record(provider, started, asyncio.TimeoutError(f"{provider} cancelled while slow"))
+            raise
+        except Exception as e:
+            self._record(provider, started, e)
+            logger.warning(f"LLM provider {provider} failed: {e}")
+            raise
+        self._record(provider, started)
+        return response
+
+    def _route(self) -> List[str]:
+        candidates = self.rank()
+        if not candidates:
+            raise ValueError("No LLM providers available for routing")
+        with self._lock:
+            self._health[candidates[0]].routed += 1
+        LLM_ROUTER_CALLS.inc(provider=candidates[0], decision="routed")
+        logger.debug(f"Routing LLM call to {candidates[0]} (fallbacks: {candidates[1:]})")
+        return candidates
+
+    async def ainvoke(self, prompt: str) -> str:
+        """Invoke the best provider, hedging and failing over as configured"""
+        queue = self._route()
+        primary = queue[0]
+        pending: Dict[asyncio.Task, str] = {}
+        hedged = False
+        last_error: Optional[Exception] = None
+
+        def launch(decision: Optional[str] = None):
+            provider = queue.pop(0)
+            if decision:
+                LLM_ROUTER_CALLS.inc(provider=provider, decision=decision)
+            pending[asyncio.ensure_future(self._acall(provider, prompt))] = provider
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if settings.llm_hedging_enabled and queue and not hedged:
+                    timeout = self._hedge_delay(primary)
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    hedged = True
+                    self.hedges += 1
+                    launch("hedged")
+                    continue
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        response = task.result()
+                    except Exception as e:
+                        last_error = e
+                        continue
+                    if provider != primary and hedged:
+                        self.hedge_wins += 1
+                        LLM_ROUTER_CALLS.inc(provider=provider, decision="hedge_win")
+                    return response
+                if not pending and queue:
+                    self.failovers += 1
+                    launch("fallback")
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def invoke(self, prompt: str) -> str:
+        """Blocking invoke with failover (no hedging)"""
+        from app.services.llm_service import get_llm_service
+        last_error: Optional[Exception] = None
+        for attempt, provider in enumerate(self._route()):
+            if attempt:
+                self.failovers += 1
+                LLM_ROUTER_CALLS.inc(provider=provider, decision="fallback")
+            started = time.perf_counter()
+            try:
+                response = get_llm_service(provider).invoke(prompt)
+            except Exception as e:
+                self._record(provider, started, e)
+                logger.warning(f"LLM provider {provider} failed: {e}")
+                last_error = e
+                continue
+            self._record(provider, started)
+            return response
+        raise last_error
+
+    def get_stats(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            providers = {p: self._health[p].to_dict(now) for p in self.providers}
+        return {
+            "providers": providers,
+            "ranking": self.rank(),
+            "failovers": self.failovers,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins
+        }
+
+# Global instance
+llm_router = None
+
+def get_llm_router() -> LLMRouter:
+    global llm_router
+    if llm_router is None:
+        llm_router = LLMRouter()
+    return llm_router
@@ -1,11 +1,80 @@
 import logging
-from typing import Optional
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
+import threading
+from typing import Any, AsyncIterator, Dict, Optional
 from app.core.config import settings
+from app.core.prompts import estimate_tokens
+from app.services.metrics_service import record_llm_tokens, track_llm_request
 
 logger = logging.getLogger(__name__)
 
+# Long-lived provider clients, one per provider. Each LangChain chat model
+# owns an SDK client with its own pooled HTTP connections, so reusing the
+# instance keeps connections alive across scoring calls.
+_llm_clients: Dict[str, Any] = {}
+_llm_clients_lock = threading.Lock()
+
+def _create_llm_client(provider: str):
+    """Create the LangChain chat model for a provider"""
+    if provider == "openai":
+        if not settings.openai_api_key:
+            raise ValueError("OpenAI API key not configured")
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(
+            api_key=settings.openai_api_key,
+            model=settings.openai_model,
+            temperature=0.7,
+            max_retries=settings.llm_max_retries,
+            timeout=settings.llm_request_timeout
+        )
+    
+    elif provider == "claude":
+        if not settings.claude_api_key:
+            raise ValueError("Claude API key not configured")
+        from langchain_anthropic import ChatAnthropic
+        return ChatAnthropic(
+            api_key=settings.claude_api_key,
+            model=settings.claude_model,
+            temperature=0.7,
+            max_retries=settings.llm_max_retries,
+            default_request_timeout=settings.llm_request_timeout
+        )
+    
+    elif provider == "grok":
+        # Grok is not directly supported by LangChain
+        # Using OpenAI-compatible API for now
+        logger.warning("Grok provider using OpenAI compatibility layer")
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(
+            api_key=settings.grok_api_key,
+            model=settings.grok_model,
+            base_url="https://api.x.ai/v1",
+            temperature=0.7,
+            max_retries=settings.llm_max_retries,
+            timeout=settings.llm_request_timeout
+        )
+    
+    else:
+        raise ValueError(f"Unsupported LLM provider: {provider}")
+
+def get_llm_client(provider: str):
+    """Get the shared chat model for a provider, creating it on first use"""
+    provider = provider.lower()
+    client = _llm_clients.get(provider)
+    if client is None:
+        with _llm_clients_lock:
+            client = _llm_clients.get(provider)
+            if client is None:
+                client = _create_llm_client(provider)
+                _llm_clients[provider] = client
+                logger.info(f"Created LLM client for provider: {provider}")
+    return client
+
+def register_llm_client(provider: str, client) -> None:
+    """Register a chat model for a provider (e.g. a local stand-in for benchmarks)"""
+    with _llm_clients_lock:
+        _llm_clients[provider.lower()] = client
+        _llm_services.pop(provider.lower(), None)
+
 class LLMService:
     """Service for managing different LLM providers"""
     
@@ -13,46 +82,48 @@ class LLMService:
         self.provider = provider
         self.llm = self._get_llm(provider)
     
+    @property
+    def model_name(self) -> str:
+        """Model configured for this provider"""
+        return {
+            "openai": settings.openai_model,
+            "claude": settings.claude_model,
+            "grok": settings.grok_model
+        }.get(self.provider.lower(), self.provider)
+    
     def _get_llm(self, provider: str):
         """Get LLM instance based on provider"""
-        provider = provider.lower()
-        
-        if provider == "openai":
-            if not settings.openai_api_key:
-                raise ValueError("OpenAI API key not configured")
-            return ChatOpenAI(
-                api_key=settings.openai_api_key,
-                model=settings.openai_model,
-                temperature=0.7
-            )
-        
-        elif provider == "claude":
-            if not settings.claude_api_key:
-                raise ValueError("Claude API key not configured")
-            return ChatAnthropic(
-                api_key=settings.claude_api_key,
-                model=settings.claude_model,
-                temperature=0.7
-            )
-        
-        elif provider == "grok":
-            # Grok is not directly supported by LangChain
-            # Using OpenAI-compatible API for now
-            logger.warning("Grok provider using OpenAI compatibility layer")
-            return ChatOpenAI(
-                api_key=settings.grok_api_key,
-                model=settings.grok_model,
-                base_url="https://api.x.ai/v1",
-                temperature=0.7
-            )
-        
-        else:
-            raise ValueError(f"Unsupported LLM provider: {provider}")
+        return get_llm_client(provider)
+    
+    def _record_tokens(self, prompt: str, message) -> None:
+        """Record provider-reported token usage, estimating when it is missing"""
+        metadata = getattr(message, "response_metadata", None) or {}
+        usage = metadata.get("token_usage") or metadata.get("usage") or {}
+        prompt_tokens = usage.get("prompt_tokens", usage.get("input_tokens"))
+        completion_tokens = usage.get("completion_tokens", usage.get("output_tokens"))
+        record_llm_tokens(
+            self.provider,
+            prompt_tokens if prompt_tokens is not None else estimate_tokens(prompt),
+            completion_tokens if completion_tokens is not None else estimate_tokens(message.content)
+        )
     
     def invoke(self, prompt: str) -> str:
         """Invoke LLM with prompt"""
         try:
-            message = self.llm.invoke(prompt)
+            with track_llm_request(self.provider):
+                message = self.llm.invoke(prompt)
+            self._record_tokens(prompt, message)
+            return message.content
+        except Exception as e:
+            logger.error(f"Error invoking {self.provider}: {e}")
+            raise
+    
+    async def ainvoke(self, prompt: str) -> str:
+        """Invoke LLM with prompt without blocking a thread"""
+        try:
+            with track_llm_request(self.provider):
+                message = await self.llm.ainvoke(prompt)
+            self._record_tokens(prompt, message)
             return message.content
         except Exception as e:
             logger.error(f"Error invoking {self.provider}: {e}")
@@ -65,8 +136,27 @@ class LLMService:
         except Exception as e:
             logger.error(f"Error streaming from {self.provider}: {e}")
             raise
+    
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        """Stream LLM response chunks asynchronously"""
+        try:
+            async for chunk in self.llm.astream(prompt):
+                yield chunk.content
+        except Exception as e:
+            logger.error(f"Error streaming from {self.provider}: {e}")
+            raise
+
+# Global instances, one per provider
+_llm_services: Dict[str, LLMService] = {}
 
 def get_llm_service(provider: str = None) -> LLMService:
-    """Get LLM service instance"""
-    provider = provider or settings.llm_provider
-    return LLMService(provider)
+    """Get LLM service instance ("auto" returns the latency-aware router)"""
+    provider = (provider or settings.llm_provider).lower()
+    if provider == "auto":
+        from app.services.llm_router import get_llm_router
+        return get_llm_router()
+    service = _llm_services.get(provider)
+    if service is None:
+        service = LLMService(provider)
+        _llm_services[provider] = service
+    return service
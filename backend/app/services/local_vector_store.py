@@ -0,0 +1,937 @@
+import heapq
+import json
+import logging
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from app.core.config import settings
+from app.services.metrics_service import timed_vector_store
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class VectorMatch:
+    """Query match, shaped like a Pinecone match (id, score, metadata)"""
+    id: str
+    score: float
+    metadata: Dict = field(default_factory=dict)
+
+
+class HNSWGraph:
+    """Hierarchical navigable small-world graph over normalized vectors.
+
+    The graph does not own any vectors: similarities are computed through
+    ``vector_fn(slots)``, which returns the (normalized) rows for the given
+    slots. Base-layer adjacency lives in ``base`` (an int32 array padded
+    with -1, usually memory-mapped); the sparse upper layers are kept in
+    plain dicts and serialized with the index manifest.
+    """
+
+    def __init__(
+        self,
+        base: np.ndarray,
+        vector_fn: Callable[[np.ndarray], np.ndarray],
+        m: int = 16,
+        ef_construction: int = 200,
+        ef_search: int = 64
+    ):
+        self.base = base
+        self.vector_fn = vector_fn
+        self.m = m
+        self.m0 = base.shape[1]
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.level_mult = 1 / math.log(max(m, 2))
+        self.levels: Dict[int, int] = {}
+        self.upper: Dict[int, Dict[int, List[int]]] = {}
+        self.entry_point = -1
+        self.max_level = -1
+
+    def to_dict(self) -> Dict:
+        return {
+            "levels": {str(k): v for k, v in self.levels.items()},
+            "upper": {
+                str(level): {str(slot): nbrs for slot, nbrs in nodes.items()}
+                for level, nodes in self.upper.items()
+            },
+            "entry_point": self.entry_point,
+            "max_level": self.max_level
+        }
+
+    def load_dict(self, data: Dict) -> None:
+        self.levels = {int(k): v for k, v in data.get("levels", {}).items()}
+        self.upper = {
+            int(level): {int(slot): nbrs for slot, nbrs in nodes.items()}
+            for level, nodes in data.get("upper", {}).items()
+        }
+        self.entry_point = data.get("entry_point", -1)
+        self.max_level = data.get("max_level", -1)
+
+    def _neighbors(self, slot: int, level: int) -> List[int]:
+        if level == 0:
+            row = self.base[slot]
+            return row[row >= 0].tolist()
+        return self.upper.get(level, {}).get(slot, [])
+
+    def _set_neighbors(self, slot: int, level: int, neighbors: List[int]) -> None:
+        if level == 0:
+            row = np.full(self.m0, -1, dtype=np.int32)
+            row[:len(neighbors)] = neighbors[:self.m0]
+            self.base[slot] = row
+        else:
+            self.upper.setdefault(level, {})[slot] = neighbors
+
+    def _similarities(self, query: np.ndarray, slots: List[int]) -> np.ndarray:
+        return self.vector_fn(np.asarray(slots, dtype=np.int64)) @ query
+
+    def _search_layer(
+        self,
+        query: np.ndarray,
+        entry_points: List[int],
+        ef: int,
+        level: int
+    ) -> List[tuple]:
+        """Best-first search of one layer; returns [(similarity, slot)] best first"""
+        sims = self._similarities(query, entry_points)
+        visited = set(entry_points)
+        candidates = [(-s, p) for s, p in zip(sims.tolist(), entry_points)]
+        heapq.heapify(candidates)
+        best = [(s, p) for s, p in zip(sims.tolist(), entry_points)]
+        heapq.heapify(best)
+        while len(best) > ef:
+            heapq.heappop(best)
+
+        while candidates:
+            neg_sim, slot = heapq.heappop(candidates)
+            if best and -neg_sim < best[0][0] and len(best) >= ef:
+                break
+            fresh = [n for n in self._neighbors(slot, level) if n not in visited]
+            if not fresh:
+                continue
+            visited.update(fresh)
+            for sim, n in zip(self._similarities(query, fresh).tolist(), fresh):
+                if len(best) < ef or sim > best[0][0]:
+                    heapq.heappush(candidates, (-sim, n))
+                    heapq.heappush(best, (sim, n))
+                    if len(best) > ef:
+                        heapq.heappop(best)
+
+        return sorted(best, reverse=True)
+
+    def _prune(self, slot: int, neighbors: List[int], limit: int) -> List[int]:
+        if len(neighbors) <= limit:
+            return neighbors
+        query = self.vector_fn(np.asarray([slot], dtype=np.int64))[0]
+        sims = self._similarities(query, neighbors)
+        order = np.argsort(-sims)[:limit]
+        return [neighbors[i] for i in order]
+
+    def insert(self, slot: int) -> None:
+        """Insert a slot whose vector is already readable through vector_fn"""
+        level = int(-math.log(1.0 - random.random()) * self.level_mult)
+        self.levels[slot] = level
+        self._set_neighbors(slot, 0, [])
+
+        if self.entry_point < 0:
+            self.entry_point = slot
+            self.max_level = level
+            return
+
+        query = self.vector_fn(np.asarray([slot], dtype=np.int64))[0]
+        entry = [self.entry_point]
+        for lc in range(self.max_level, level, -1):
+            entry = [self._search_layer(query, entry, 1, lc)[0][1]]
+
+        for lc in range(min(level, self.max_level), -1, -1):
+            found = self._search_layer(query, entry, self.ef_construction, lc)
+            limit = self.m0 if lc == 0 else self.m
+            neighbors = [p for _, p in found if p != slot][:self.m]
+            self._set_neighbors(slot, lc, neighbors)
+            for n in neighbors:
+                updated = self._neighbors(n, lc) + [slot]
+                self._set_neighbors(n, lc, self._prune(n, updated, limit))
+            entry = [p for _, p in found]
+
+        if level > self.max_level:
+            self.max_level = level
+            self.entry_point = slot
+
+    def search(self, query: np.ndarray, k: int) -> List[tuple]:
+        """Approximate k-NN; returns [(similarity, slot)] best first"""
+        if self.entry_point < 0:
+            return []
+        entry = [self.entry_point]
+        for lc in range(self.max_level, 0, -1):
+            entry = [self._search_layer(query, entry, 1, lc)[0][1]]
+        return self._search_layer(query, entry, max(self.ef_search, k), 0)[:k]
+
+
+class LocalVectorStoreService:
+    """In-process vector store with memory-mapped persistence.
+
+    Vectors are L2-normalized and scored by cosine similarity, like the
+    Pinecone index. Small corpora are searched exactly with one matrix
+    product; once the live count reaches ``local_index_hnsw_threshold`` an
+    HNSW graph is built in a background thread and used for queries once it
+    is ready (exact search serves queries meanwhile). With ``path=None``
+    everything stays in memory.
+
+    With ``local_index_precision`` set to float16 or int8 (and/or
+    ``local_index_pca_dim`` > 0) the search runs over compact codes: each
+    vector is optionally projected onto the top PCA components, then stored
+    as float16 or as int8 with a per-vector scale. The coarse search returns
+    ``top_k * local_index_rerank_factor`` candidates, which are reranked
+    against the full-precision vectors. Those stay in ``vectors.f32`` and
+    are only read for the shortlist.
+    """
+
+    MANIFEST = "index.json"
+    VECTORS = "vectors.f32"
+    GRAPH = "graph.i32"
+    CODES = "codes.bin"
+    SCALES = "scales.f32"
+    PCA = "pca.f32"
+    SLOTS = "slots.db"
+    GRAPH_SNAPSHOT = "hnsw.json"
+    CODE_DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+    SCAN_CHUNK = 65536
+    GRAPH_BUILD_SLICE = 0.02  # seconds of inserts per lock hold while building the graph
+
+    def __init__(self, path: Optional[str] = None, dimension: Optional[int] = None):
+        self.path = path
+        self.dimension = dimension or settings.embedding_dimension
+        self.hnsw_threshold = settings.local_index_hnsw_threshold
+        self.precision = settings.local_index_precision
+        if self.precision not in self.CODE_DTYPES:
+            raise ValueError(f"Unsupported index precision: {self.precision}")
+        self.pca_dim = settings.local_index_pca_dim
+        self.rerank_factor = max(1, settings.local_index_rerank_factor)
+        self.generation = 0
+        self._db: Optional[sqlite3.Connection] = None
+        self._inserts_since_snapshot = 0
+        # Bumped whenever slots are renumbered or re-encoded, so a graph being
+        # built over the old layout is discarded
+        self._graph_epoch = 0
+        self._graph_thread: Optional[threading.Thread] = None
+        self._graph_thread_epoch = -1
+        self._vacuum_thread: Optional[threading.Thread] = None
+        self._lock = threading.RLock()
+        try:
+            with self._lock:
+                if path and os.path.exists(os.path.join(path, self.MANIFEST)):
+                    self._load()
+                else:
+                    self._reset(capacity=1024)
+            logger.info(
+                f"Local vector index ready: {self.count_live()} vectors "
+                f"({path or 'in-memory'})"
+            )
+        except Exception as e:
+            logger.error(f"Failed to initialize local vector index: {e}")
+            raise
+
+    # Storage
+    #
+    # Per-slot arrays are memory-mapped files; ids and metadata are rows in
+    # a SQLite table written per upsert/delete, and the HNSW upper layers are
+    # snapshotted every ``local_index_graph_snapshot_every`` inserts. The JSON
+    # manifest only holds sizes and settings. Compaction and delete_all write
+    # a new generation of files and switch to it by replacing the manifest.
+
+    def _file(self, name: str, generation: Optional[int] = None) -> str:
+        generation = self.generation if generation is None else generation
+        if generation:
+            stem, ext = os.path.splitext(name)
+            name = f"{stem}.{generation}{ext}"
+        return os.path.join(self.path, name)
+
+    def _allocate(self, name: str, dtype, shape: tuple, fill=0) -> np.ndarray:
+        if not self.path:
+            return np.full(shape, fill, dtype=dtype)
+        array = np.memmap(self._file(name), dtype=dtype, mode="w+", shape=shape)
+        array[:] = fill
+        return array
+
+    def _open(self, name: str, dtype, shape: tuple) -> np.ndarray:
+        return np.memmap(self._file(name), dtype=dtype, mode="r+", shape=shape)
+
+    def _open_slots_db(self) -> None:
+        if not self.path:
+            return
+        self._db = sqlite3.connect(self._file(self.SLOTS), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS slots (slot INTEGER PRIMARY KEY, vector_id TEXT, metadata TEXT)"
+        )
+        self._db.commit()
+
+    def _new_graph(self, base: Optional[np.ndarray] = None) -> HNSWGraph:
+        return HNSWGraph(
+            self._graph if base is None else base,
+            self._coarse_vectors,
+            m=settings.local_index_hnsw_m,
+            ef_construction=settings.local_index_hnsw_ef_construction,
+            ef_search=settings.local_index_hnsw_ef_search
+        )
+
+    def _reset(self, capacity: int, generation: int = 0) -> None:
+        """Start an empty index in a fresh generation of files"""
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+        old_generation, old_db = self.generation, self._db
+        self.generation = generation
+        self.capacity = capacity
+        self.count = 0
+        self._vectors = self._allocate(self.VECTORS, np.float32, (capacity, self.dimension))
+        self._graph = self._allocate(
+            self.GRAPH, np.int32, (capacity, 2 * settings.local_index_hnsw_m), fill=-1
+        )
+        self._ids: List[Optional[str]] = []
+        self._metadata: List[Optional[Dict]] = []
+        self._slot_by_id: Dict[str, int] = {}
+        self._live = np.zeros(capacity, dtype=bool)
+        self.hnsw: Optional[HNSWGraph] = None
+        self._graph_epoch += 1
+        self._pca: Optional[np.ndarray] = None
+        self._allocate_codes()
+        if self.path and os.path.exists(self._file(self.SLOTS)):
+            os.remove(self._file(self.SLOTS))
+        self._open_slots_db()
+        self._save_manifest()
+        if old_db is not None:
+            old_db.close()
+        if generation != old_generation:
+            self._remove_generation(old_generation)
+
+    def _load(self) -> None:
+        with open(os.path.join(self.path, self.MANIFEST)) as f:
+            manifest = json.load(f)
+        if manifest["dimension"] != self.dimension:
+            raise ValueError(
+                f"Index dimension {manifest['dimension']} does not match "
+                f"configured dimension {self.dimension}"
+            )
+        self.generation = manifest.get("generation", 0)
+        self.capacity = manifest["capacity"]
+        self._open_slots_db()
+        if "ids" in manifest:
+            self._migrate_manifest(manifest)
+
+        rows = self._db.execute("SELECT slot, vector_id, metadata FROM slots ORDER BY slot").fetchall()
+        # Rows are committed before the manifest, so trust whichever is further ahead
+        self.count = max([manifest["count"]] + [slot + 1 for slot, _, _ in rows[-1:]])
+        self._ids = [None] * self.count
+        self._metadata = [None] * self.count
+        for slot, vector_id, metadata in rows:
+            self._ids[slot] = vector_id
+            self._metadata[slot] = json.loads(metadata) if metadata else {}
+        self._slot_by_id = {
+            vid: slot for slot, vid in enumerate(self._ids) if vid is not None
+        }
+        for slot, vid in enumerate(self._ids):
+            if vid is not None and self._slot_by_id[vid] != slot:
+                self._ids[slot] = self._metadata[slot] = None
+        self._live = np.zeros(self.capacity, dtype=bool)
+        self._live[list(self._slot_by_id.values())] = True
+        self._vectors = self._open(self.VECTORS, np.float32, (self.capacity, self.dimension))
+        self._graph = self._open(
+            self.GRAPH, np.int32, (self.capacity, manifest["graph_width"])
+        )
+
+        stored_precision = manifest.get("precision", "float32")
+        coarse_dim = manifest.get("coarse_dim", self.dimension)
+        self._pca = None
+        if manifest.get("pca"):
+            self._pca = np.fromfile(self._file(self.PCA), dtype=np.float32).reshape(coarse_dim, self.dimension)
+        if stored_precision == self.precision and (self.pca_dim or None) == (
+            coarse_dim if self._pca is not None else None
+        ):
+            self._open_codes()
+            self.hnsw = self._load_graph_snapshot() if manifest.get("hnsw") else None
+            if self.hnsw is None and self.count_live() >= self.hnsw_threshold:
+                self._schedule_graph_build()
+        else:
+            # Storage settings changed: re-encode from the full-precision vectors
+            logger.info(f"Re-encoding local index from {stored_precision} to {self.precision}")
+            if self._pca is not None and self._pca.shape[0] != self.pca_dim:
+                self._pca = None
+            self.hnsw = None
+            self._rebuild_codes()
+            self._flush()
+            if self.count_live() >= self.hnsw_threshold:
+                self._schedule_graph_build()
+        if "ids" in manifest:
+            self._save_manifest()
+
+    def _migrate_manifest(self, manifest: Dict) -> None:
+        """Move ids, metadata and the graph out of a pre-SQLite manifest"""
+        logger.info("Migrating local index ids and metadata to SQLite")
+        self._db.executemany(
+            "INSERT OR REPLACE INTO slots (slot, vector_id, metadata) VALUES (?, ?, ?)",
+            [
+                (slot, vid, json.dumps(manifest["metadata"][slot] or {}))
+                for slot, vid in enumerate(manifest["ids"]) if vid is not None
+            ]
+        )
+        self._db.commit()
+        if manifest.get("hnsw") is not None:
+            self._write_json(self._file(self.GRAPH_SNAPSHOT), manifest["hnsw"])
+            manifest["hnsw"] = True
+
+    def _load_graph_snapshot(self) -> Optional[HNSWGraph]:
+        """Load the last graph snapshot and insert slots added after it was taken"""
+        snapshot = self._file(self.GRAPH_SNAPSHOT)
+        if not os.path.exists(snapshot):
+            return None
+        with open(snapshot) as f:
+            data = json.load(f)
+        graph = self._new_graph()
+        graph.load_dict(data)
+        # Edges or levels written after the last committed upsert point past the end
+        self._graph[self._graph >= self.count] = -1
+        graph.levels = {slot: level for slot, level in graph.levels.items() if slot < self.count}
+        graph.upper = {
+            level: {
+                slot: [n for n in nbrs if n < self.count]
+                for slot, nbrs in nodes.items() if slot < self.count
+            }
+            for level, nodes in graph.upper.items()
+        }
+        if graph.entry_point >= self.count:
+            return None
+        missing = [slot for slot in sorted(self._slot_by_id.values()) if slot not in graph.levels]
+        if missing:
+            logger.info(f"Inserting {len(missing)} vectors added since the last graph snapshot")
+            for slot in missing:
+                graph.insert(slot)
+            self.hnsw = graph
+            self._save_graph_snapshot()
+        return graph
+
+    @staticmethod
+    def _write_json(path: str, data: Dict) -> None:
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def _save_manifest(self) -> None:
+        if not self.path:
+            return
+        self._write_json(os.path.join(self.path, self.MANIFEST), {
+            "dimension": self.dimension,
+            "generation": self.generation,
+            "capacity": self.capacity,
+            "count": self.count,
+            "graph_width": self._graph.shape[1],
+            "precision": self.precision,
+            "coarse_dim": self.coarse_dim,
+            "pca": self._pca is not None,
+            "hnsw": self.hnsw is not None
+        })
+
+    def _save_graph_snapshot(self) -> None:
+        self._inserts_since_snapshot = 0
+        if self.path and self.hnsw:
+            self._graph.flush()
+            self._write_json(self._file(self.GRAPH_SNAPSHOT), self.hnsw.to_dict())
+
+    def _save_slots(self, added: List[int], removed: List[int]) -> None:
+        """Persist new slots' ids and metadata and drop tombstoned ones"""
+        if self._db is None:
+            return
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO slots (slot, vector_id, metadata) VALUES (?, ?, ?)",
+                [(slot, self._ids[slot], json.dumps(self._metadata[slot])) for slot in added]
+            )
+            self._db.executemany("DELETE FROM slots WHERE slot = ?", [(slot,) for slot in removed])
+
+    def _remove_generation(self, generation: int) -> None:
+        if not self.path:
+            return
+        for name in (self.VECTORS, self.GRAPH, self.CODES, self.SCALES, self.PCA, self.SLOTS, self.GRAPH_SNAPSHOT):
+            path = self._file(name, generation)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _flush(self) -> None:
+        if self.path:
+            for _, attr, _, _, _ in self._arrays():
+                getattr(self, attr).flush()
+        self._save_manifest()
+
+    # Compact codes
+
+    @property
+    def coarse_dim(self) -> int:
+        return self._pca.shape[0] if self._pca is not None else self.dimension
+
+    @property
+    def compact(self) -> bool:
+        """True when the coarse search runs over codes rather than the full vectors"""
+        return self.precision != "float32" or self._pca is not None
+
+    def _arrays(self) -> List[tuple]:
+        """(file, attribute, dtype, row width or None, fill) for every per-slot array"""
+        arrays = [
+            (self.VECTORS, "_vectors", np.float32, self.dimension, 0),
+            (self.GRAPH, "_graph", np.int32, self._graph.shape[1], -1)
+        ]
+        if self.compact:
+            arrays.append((self.CODES, "_codes", self.CODE_DTYPES[self.precision], self.coarse_dim, 0))
+            if self.precision == "int8":
+                arrays.append((self.SCALES, "_scales", np.float32, None, 0))
+        return arrays
+
+    def _allocate_codes(self) -> None:
+        self._codes = self._scales = None
+        for name, attr, dtype, width, fill in self._arrays()[2:]:
+            shape = (self.capacity,) if width is None else (self.capacity, width)
+            setattr(self, attr, self._allocate(name, dtype, shape, fill))
+
+    def _open_codes(self) -> None:
+        self._codes = self._scales = None
+        for name, attr, dtype, width, _ in self._arrays()[2:]:
+            shape = (self.capacity,) if width is None else (self.capacity, width)
+            setattr(self, attr, self._open(name, dtype, shape))
+
+    def _fit_pca(self) -> None:
+        """Fit an (uncentered) PCA projection so coarse dot products approximate cosine"""
+        live = np.flatnonzero(self._live[:self.count])
+        sample = np.sort(np.random.default_rng(0).choice(live, min(len(live), 20000), replace=False))
+        _, _, vt = np.linalg.svd(np.asarray(self._vectors[sample]), full_matrices=False)
+        self._pca = np.ascontiguousarray(vt[:self.pca_dim], dtype=np.float32)
+        if self.path:
+            self._pca.tofile(self._file(self.PCA))
+        logger.info(f"Fitted PCA {self.dimension} -> {self.pca_dim} dims on {len(sample)} vectors")
+
+    def _encode(self, matrix: np.ndarray) -> tuple:
+        """Full-precision rows -> (codes, scales or None)"""
+        coarse = matrix @ self._pca.T if self._pca is not None else matrix
+        if self.precision == "int8":
+            scales = np.abs(coarse).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            codes = np.clip(np.rint(coarse / scales[:, None]), -127, 127).astype(np.int8)
+            return codes, scales.astype(np.float32)
+        return coarse.astype(self.CODE_DTYPES[self.precision]), None
+
+    def _write_codes(self, start: int, matrix: np.ndarray) -> None:
+        if not self.compact:
+            return
+        codes, scales = self._encode(matrix)
+        self._codes[start:start + len(matrix)] = codes
+        if scales is not None:
+            self._scales[start:start + len(matrix)] = scales
+
+    def _rebuild_codes(self) -> None:
+        """(Re)allocate the codes for the current settings and encode every slot"""
+        if self.pca_dim and self._pca is None and self.count_live() >= settings.local_index_pca_min_vectors:
+            self._fit_pca()
+        self._allocate_codes()
+        for start in range(0, self.count, self.SCAN_CHUNK):
+            end = min(start + self.SCAN_CHUNK, self.count)
+            self._write_codes(start, np.asarray(self._vectors[start:end]))
+
+    def _coarse_vectors(self, slots) -> np.ndarray:
+        """Approximate (decoded) vectors used by the coarse search and the HNSW graph"""
+        if not self.compact:
+            return self._vectors[slots]
+        vectors = self._codes[slots].astype(np.float32)
+        if self.precision == "int8":
+            vectors *= self._scales[slots][:, None]
+        return vectors
+
+    def _coarse_query(self, query: np.ndarray) -> np.ndarray:
+        return query @ self._pca.T if self._pca is not None else query
+
+    def _coarse_scores(self, query: np.ndarray) -> np.ndarray:
+        """Exact scan over the coarse codes, chunked to bound temporary memory"""
+        scores = np.empty(self.count, dtype=np.float32)
+        for start in range(0, self.count, self.SCAN_CHUNK):
+            end = min(start + self.SCAN_CHUNK, self.count)
+            scores[start:end] = self._coarse_vectors(slice(start, end)) @ query
+        return scores
+
+    def _grow(self, needed: int) -> None:
+        if needed <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        arrays = self._arrays()
+        if self.path:
+            old_capacity = self.capacity
+            for name, attr, dtype, width, fill in arrays:
+                getattr(self, attr).flush()
+                setattr(self, attr, None)
+                item = np.dtype(dtype).itemsize * (width or 1)
+                with open(self._file(name), "r+b") as f:
+                    f.truncate(capacity * item)
+                array = self._open(name, dtype, (capacity,) if width is None else (capacity, width))
+                array[old_capacity:] = fill
+                setattr(self, attr, array)
+        else:
+            for _, attr, dtype, width, fill in arrays:
+                array = np.full((capacity,) if width is None else (capacity, width), fill, dtype=dtype)
+                array[:self.capacity] = getattr(self, attr)
+                setattr(self, attr, array)
+        live = np.zeros(capacity, dtype=bool)
+        live[:self.capacity] = self._live
+        self._live = live
+        self.capacity = capacity
+        if self.hnsw:
+            self.hnsw.base = self._graph
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def count_live(self) -> int:
+        return len(self._slot_by_id)
+
+    def _schedule_graph_build(self) -> None:
+        """Start building the HNSW graph in the background unless a build is already running"""
+        thread = self._graph_thread
+        if thread and thread.is_alive() and self._graph_thread_epoch == self._graph_epoch:
+            return
+        self._graph_thread_epoch = self._graph_epoch
+        self._graph_thread = threading.Thread(
+            target=self._build_graph, args=(self._graph_epoch,), name="hnsw-build", daemon=True
+        )
+        self._graph_thread.start()
+
+    def _build_graph(self, epoch: int) -> None:
+        """Build a graph into a private array, a short slice of inserts per lock hold.
+
+        Queries and upserts interleave with the build; slots upserted
+        meanwhile are inserted before the graph is swapped in. The build is
+        abandoned if the slots are renumbered or re-encoded under it.
+        """
+        try:
+            with self._lock:
+                if epoch != self._graph_epoch or self.hnsw:
+                    return
+                logger.info(f"Building HNSW graph over {self.count_live()} vectors")
+                graph = self._new_graph(np.full((self.capacity, self._graph.shape[1]), -1, dtype=np.int32))
+                todo = sorted(self._slot_by_id.values(), reverse=True)
+                seen = self.count
+            started = time.perf_counter()
+            while True:
+                with self._lock:
+                    if epoch != self._graph_epoch:
+                        logger.info("Discarding HNSW build: index changed underneath it")
+                        return
+                    todo.extend(slot for slot in range(seen, self.count) if self._live[slot])
+                    seen = self.count
+                    if len(graph.base) < self.capacity:
+                        base = np.full((self.capacity, graph.m0), -1, dtype=np.int32)
+                        base[:len(graph.base)] = graph.base
+                        graph.base = base
+                    deadline = time.perf_counter() + self.GRAPH_BUILD_SLICE
+                    while todo and time.perf_counter() < deadline:
+                        graph.insert(todo.pop())
+                    if todo:
+                        continue
+                    self._graph[:] = graph.base
+                    graph.base = self._graph
+                    self.hnsw = graph
+                    self._save_graph_snapshot()
+                    self._save_manifest()
+                    logger.info(f"HNSW graph ready in {time.perf_counter() - started:.1f}s")
+                    return
+        except Exception as e:
+            logger.error(f"Error building HNSW graph: {e}")
+
+    def wait_for_graph(self, timeout: Optional[float] = None) -> bool:
+        """Block until a pending graph build finishes; True if queries now use the graph"""
+        thread = self._graph_thread
+        if thread:
+            thread.join(timeout)
+        return self.hnsw is not None
+
+    def _needs_compaction(self) -> bool:
+        dead = self.count - self.count_live()
+        return (
+            dead >= settings.local_index_compact_min_dead
+            and dead >= self.count * settings.local_index_compact_ratio
+        )
+
+    def _schedule_vacuum(self) -> None:
+        """Compact in a background thread so the call that crossed the threshold returns at once"""
+        thread = self._vacuum_thread
+        if thread and thread.is_alive():
+            return
+        self._vacuum_thread = threading.Thread(target=self._vacuum_if_needed, name="index-vacuum", daemon=True)
+        self._vacuum_thread.start()
+
+    def _vacuum_if_needed(self) -> None:
+        try:
+            with self._lock:
+                if self._needs_compaction():
+                    self.vacuum()
+        except Exception as e:
+            logger.error(f"Error compacting local index: {e}")
+
+    def vacuum(self) -> None:
+        """Drop tombstoned slots by copying live vectors into a new generation of files"""
+        with self._lock:
+            live = np.flatnonzero(self._live[:self.count])
+            logger.info(f"Compacting local index: {len(live)} live of {self.count} slots")
+            old_generation, old_db = self.generation, self._db
+            capacity = 1024
+            while capacity < len(live):
+                capacity *= 2
+
+            self.generation += 1
+            for name, attr, dtype, width, fill in self._arrays():
+                array = self._allocate(name, dtype, (capacity,) if width is None else (capacity, width), fill)
+                if attr != "_graph":
+                    old = getattr(self, attr)
+                    for start in range(0, len(live), self.SCAN_CHUNK):
+                        chunk = live[start:start + self.SCAN_CHUNK]
+                        array[start:start + len(chunk)] = old[chunk]
+                setattr(self, attr, array)
+            if self.path and self._pca is not None:
+                self._pca.tofile(self._file(self.PCA))
+
+            self._ids = [self._ids[p] for p in live]
+            self._metadata = [self._metadata[p] for p in live]
+            self._slot_by_id = {vid: slot for slot, vid in enumerate(self._ids)}
+            self.capacity = capacity
+            self.count = len(live)
+            self._live = np.zeros(capacity, dtype=bool)
+            self._live[:self.count] = True
+            self.hnsw = None
+            self._graph_epoch += 1
+            self._open_slots_db()
+            self._save_slots(list(range(self.count)), [])
+            # Replacing the manifest switches readers to the new generation
+            self._flush()
+            if self.count_live() >= self.hnsw_threshold:
+                self._schedule_graph_build()
+            if old_db is not None:
+                old_db.close()
+            self._remove_generation(old_generation)
+
+    # VectorStoreService contract
+
+    @timed_vector_store("upsert")
+    def upsert_vectors(self, vectors: List[tuple]) -> None:
+        """
+        Upsert vectors to the local index
+        vectors: List of tuples (id, embedding, metadata)
+        """
+        try:
+            with self._lock:
+                if not vectors:
+                    return
+                matrix = self._normalize(
+                    np.asarray([v[1] for v in vectors], dtype=np.float32)
+                )
+                if matrix.shape[1] != self.dimension:
+                    raise ValueError(
+                        f"Expected {self.dimension}-dim vectors, got {matrix.shape[1]}"
+                    )
+                self._grow(self.count + len(vectors))
+
+                # Replaced ids are tombstoned and re-appended so graph edges
+                # never point at a vector that changed underneath them
+                start = self.count
+                replaced: List[int] = []
+                self._vectors[start:start + len(vectors)] = matrix
+                self._write_codes(start, matrix)
+                for offset, item in enumerate(vectors):
+                    vector_id = item[0]
+                    metadata = item[2] if len(item) > 2 else {}
+                    old = self._slot_by_id.get(vector_id)
+                    if old is not None:
+                        self._ids[old] = None
+                        self._metadata[old] = None
+                        self._live[old] = False
+                        replaced.append(old)
+                    slot = start + offset
+                    self._live[slot] = True
+                    self._ids.append(vector_id)
+                    self._metadata.append(metadata or {})
+                    self._slot_by_id[vector_id] = slot
+                self.count += len(vectors)
+
+                if (
+                    self.pca_dim and self._pca is None
+                    and self.count_live() >= settings.local_index_pca_min_vectors
+                ):
+                    # Enough data to fit PCA: re-encode everything in the reduced
+                    # space and rebuild the graph over the new codes
+                    self.hnsw = None
+                    self._graph_epoch += 1
+                    self._rebuild_codes()
+                    if self.count_live() >= self.hnsw_threshold:
+                        self._schedule_graph_build()
+                elif self.hnsw:
+                    for slot in range(start, self.count):
+                        self.hnsw.insert(slot)
+                    self._inserts_since_snapshot += len(vectors)
+                elif self.count_live() >= self.hnsw_threshold:
+                    self._schedule_graph_build()
+
+                # Vectors reach disk before the slots that point at them
+                self._flush()
+                self._save_slots(list(range(start, self.count)), replaced)
+                if self._needs_compaction():
+                    self._schedule_vacuum()
+                elif self._inserts_since_snapshot >= settings.local_index_graph_snapshot_every:
+                    self._save_graph_snapshot()
+            logger.info(f"Upserted {len(vectors)} vectors to local index")
+        except Exception as e:
+            logger.error(f"Error upserting vectors: {e}")
+            raise
+
+    def _search(self, query: np.ndarray, top_k: int, rerank: bool = True) -> List[tuple]:
+        """[(similarity, slot)] best first; compact indexes rerank a shortlist at full precision"""
+        k = top_k * self.rerank_factor if self.compact and rerank else top_k
+        coarse_query = self._coarse_query(query)
+        if self.hnsw:
+            # Over-fetch so tombstoned slots don't starve the result
+            dead = self.count - self.count_live()
+            found = self.hnsw.search(coarse_query, k + min(dead, k))
+            hits = [(s, p) for s, p in found if self._ids[p] is not None][:k]
+        else:
+            scores = self._coarse_scores(coarse_query)
+            scores = np.where(self._live[:self.count], scores, -np.inf)
+            k = min(k, self.count_live())
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            hits = [(float(scores[p]), int(p)) for p in top]
+
+        if not (self.compact and rerank) or not hits:
+            return hits[:top_k]
+        slots = np.sort(np.asarray([p for _, p in hits], dtype=np.int64))
+        exact = self._vectors[slots] @ query
+        order = np.argsort(-exact)[:top_k]
+        return [(float(exact[i]), int(slots[i])) for i in order]
+
+    @timed_vector_store("query")
+    def query_similar(self, embedding: List[float], top_k: int = 5) -> List[VectorMatch]:
+        """Query similar vectors"""
+        try:
+            with self._lock:
+                if not self._slot_by_id or top_k <= 0:
+                    return []
+                query = self._normalize(np.asarray([embedding], dtype=np.float32))[0]
+                hits = self._search(query, top_k)
+                return [
+                    VectorMatch(id=self._ids[p], score=float(s), metadata=self._metadata[p])
+                    for s, p in hits
+                ]
+        except Exception as e:
+            logger.error(f"Error querying vectors: {e}")
+            raise
+
+    @timed_vector_store("fetch")
+    def fetch_vectors(self, vector_ids: List[str]) -> Dict[str, List[float]]:
+        """Fetch stored (normalized) vectors by ID (missing IDs are omitted)"""
+        try:
+            with self._lock:
+                found = [
+                    (vid, self._slot_by_id[vid]) for vid in vector_ids if vid in self._slot_by_id
+                ]
+                if not found:
+                    return {}
+                rows = self._vectors[[slot for _, slot in found]]
+                return {vid: row.tolist() for (vid, _), row in zip(found, rows)}
+        except Exception as e:
+            logger.error(f"Error fetching vectors: {e}")
+            raise
+    
+    @timed_vector_store("delete")
+    def delete_vector(self, vector_id: str) -> None:
+        """Delete a vector by ID"""
+        try:
+            with self._lock:
+                slot = self._slot_by_id.pop(vector_id, None)
+                if slot is not None:
+                    self._ids[slot] = None
+                    self._metadata[slot] = None
+                    self._live[slot] = False
+                    self._save_slots([], [slot])
+                    if self._needs_compaction():
+                        self._schedule_vacuum()
+            logger.info(f"Deleted vector: {vector_id}")
+        except Exception as e:
+            logger.error(f"Error deleting vector: {e}")
+            raise
+
+    def get_stats(self) -> Dict:
+        """Storage layout and memory per vector"""
+        code_bytes = self.coarse_dim * np.dtype(self.CODE_DTYPES[self.precision]).itemsize
+        if self.precision == "int8":
+            code_bytes += 4  # per-vector scale
+        full_bytes = self.dimension * 4
+        search_bytes = code_bytes if self.compact else full_bytes
+        return {
+            "live_vectors": self.count_live(),
+            "precision": self.precision,
+            "dimension": self.dimension,
+            "coarse_dimension": self.coarse_dim,
+            "pca": self._pca is not None,
+            "hnsw": self.hnsw is not None,
+            "rerank_factor": self.rerank_factor if self.compact else None,
+            "search_bytes_per_vector": search_bytes,
+            "full_precision_bytes_per_vector": full_bytes,
+            "graph_bytes_per_vector": self._graph.shape[1] * 4 if self.hnsw else 0,
+            "compression_ratio": round(full_bytes / search_bytes, 2)
+        }
+
+    def measure_recall(self, sample_size: int = 100, top_k: int = 10, noise: float = 0.05, seed: int = 0) -> Dict:
+        """Recall@k of the index against exact full-precision search.
+
+        Queries are stored vectors with Gaussian noise added, so each has a
+        realistic neighbourhood rather than an exact self-match.
+        """
+        with self._lock:
+            live = np.flatnonzero(self._live[:self.count])
+            if not len(live):
+                return {"queries": 0}
+            rng = np.random.default_rng(seed)
+            picks = rng.choice(live, min(sample_size, len(live)), replace=False)
+            queries = np.asarray(self._vectors[np.sort(picks)])
+            queries = self._normalize(queries + rng.normal(0, noise, queries.shape).astype(np.float32))
+
+            coarse_hits, reranked_hits = 0, 0
+            for query in queries:
+                scores = np.empty(self.count, dtype=np.float32)
+                for start in range(0, self.count, self.SCAN_CHUNK):
+                    end = min(start + self.SCAN_CHUNK, self.count)
+                    scores[start:end] = self._vectors[start:end] @ query
+                scores = np.where(self._live[:self.count], scores, -np.inf)
+                k = min(top_k, len(live))
+                exact = set(np.argpartition(-scores, k - 1)[:k].tolist())
+                coarse_hits += len(exact & {p for _, p in self._search(query, k, rerank=False)})
+                reranked_hits += len(exact & {p for _, p in self._search(query, k)})
+            total = len(queries) * min(top_k, len(live))
+            return {
+                "queries": len(queries),
+                "top_k": top_k,
+                "recall_coarse": round(coarse_hits / total, 4),
+                "recall": round(reranked_hits / total, 4)
+            }
+
+    def delete_all(self) -> None:
+        """Delete all vectors from index"""
+        try:
+            with self._lock:
+                self._reset(capacity=1024, generation=self.generation + 1)
+            logger.info("Deleted all vectors from index")
+        except Exception as e:
+            logger.error(f"Error deleting all vectors: {e}")
+            raise
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MatchRunStore:
+    """Saved match runs: per-CV MatchResults keyed by a hash of the JD and scoring settings.
+
+    Each stored result carries the content hash of the CV text it was scored
+    on, so a re-run only needs to score CVs that are new or whose text
+    changed since the last run.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or settings.match_run_store_path
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS match_runs ("
+                "run_key TEXT PRIMARY KEY, job_title TEXT, created_at REAL, updated_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS match_run_results ("
+                "run_key TEXT, cv_id TEXT, content_hash TEXT, result TEXT, "
+                "PRIMARY KEY (run_key, cv_id))"
+            )
+            self._conn.commit()
+            self._lock = threading.Lock()
+            logger.info(f"Match run store ready: {path}")
+        except Exception as e:
+            logger.error(f"Failed to initialize match run store: {e}")
+            raise
+
+    @staticmethod
+    def run_key(jd: Dict, scoring: Dict) -> str:
+        """Hash of the JD content plus every setting that changes a CV's score"""
+        payload = json.dumps({"jd": jd, "scoring": scoring}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_results(self, run_key: str, cv_ids: List[str]) -> Dict[str, Dict]:
+        """Stored results for the given CVs in a run (missing ids are omitted)"""
+        try:
+            results = {}
+            with self._lock:
+                for start in range(0, len(cv_ids), 500):
+                    chunk = cv_ids[start:start + 500]
+                    rows = self._conn.execute(
+                        "SELECT cv_id, result FROM match_run_results "
+                        f"WHERE run_key = ? AND cv_id IN ({','.join('?' * len(chunk))})",
+                        [run_key, *chunk]
+                    ).fetchall()
+                    for cv_id, result in rows:
+                        results[cv_id] = json.loads(result)
+            return results
+        except Exception as e:
+            logger.error(f"Error fetching match run {run_key}: {e}")
+            raise
+
+    def save_results(self, run_key: str, job_title: str, results: List[Dict]) -> None:
+        """Add or replace per-CV results (MatchResult dicts with content_hash) in a run"""
+        try:
+            now = time.time()
+            with self._lock:
+                self._conn.execute(
+                    "INSERT INTO match_runs (run_key, job_title, created_at, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(run_key) DO UPDATE SET updated_at = excluded.updated_at",
+                    (run_key, job_title, now, now)
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO match_run_results (run_key, cv_id, content_hash, result) "
+                    "VALUES (?, ?, ?, ?)",
+                    [(run_key, r["cv_id"], r.get("content_hash"), json.dumps(r)) for r in results]
+                )
+                self._conn.commit()
+            logger.info(f"Saved {len(results)} results to match run {run_key[:12]}")
+        except Exception as e:
+            logger.error(f"Error saving match run {run_key}: {e}")
+            raise
+
+# Global instance
+match_run_store = None
+
+def get_match_run_store() -> MatchRunStore:
+    global match_run_store
+    if match_run_store is None:
+        match_run_store = MatchRunStore()
+    return match_run_store
@@ -0,0 +1,253 @@
+import asyncio
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Prometheus default buckets, extended for multi-second LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """Monotonic counter with labels"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels (Prometheus semantics)"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(e[0]), e[1], e[2])) for key, e in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+# Global instance
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "cv_matching_stage_seconds",
+    "Time spent in each RAG pipeline stage",
+    ("stage", "outcome")
+)
+VECTOR_STORE_SECONDS = registry.histogram(
+    "cv_matching_vector_store_seconds",
+    "Vector store call latency",
+    ("operation", "outcome")
+)
+LLM_REQUEST_SECONDS = registry.histogram(
+    "cv_matching_llm_request_seconds",
+    "LLM request latency by provider",
+    ("provider", "outcome")
+)
+LLM_REQUESTS = registry.counter(
+    "cv_matching_llm_requests_total",
+    "LLM requests by provider and outcome",
+    ("provider", "outcome")
+)
+SINGLE_FLIGHT_CALLS = registry.counter(
+    "cv_matching_single_flight_calls_total",
+    "Calls into single-flight groups: leader ran the work, coalesced waited on it",
+    ("flight", "role")
+)
+LLM_ROUTER_CALLS = registry.counter(
+    "cv_matching_llm_router_calls_total",
+    "Router decisions by provider: routed (first choice), hedged, fallback and hedge_win",
+    ("provider", "decision")
+)
+LLM_ROUTER_COOLDOWNS = registry.counter(
+    "cv_matching_llm_router_cooldowns_total",
+    "Times a provider was put in cooldown, by reason (rate_limit or errors)",
+    ("provider", "reason")
+)
+LLM_TOKENS = registry.counter(
+    "cv_matching_llm_tokens_total",
+    "LLM tokens by provider and direction (prompt or completion)",
+    ("provider", "direction")
+)
+
+
+def timed_stage(stage: str):
+    """Decorator recording a pipeline node's duration in STAGE_SECONDS"""
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(self, state, *args, **kwargs):
+                had_error = getattr(state, "error", None)
+                started = time.perf_counter()
+                outcome = "error"
+                try:
+                    result = await fn(self, state, *args, **kwargs)
+                    outcome = "error" if getattr(result, "error", None) and not had_error else "success"
+                    return result
+                finally:
+                    STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage, outcome=outcome)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(self, state, *args, **kwargs):
+            had_error = getattr(state, "error", None)
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = fn(self, state, *args, **kwargs)
+                outcome = "error" if getattr(result, "error", None) and not had_error else "success"
+                return result
+            finally:
+                STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage, outcome=outcome)
+        return wrapper
+    return decorator
+
+
+def timed_vector_store(operation: str):
+    """Decorator recording a vector store method's duration in VECTOR_STORE_SECONDS"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = fn(*args, **kwargs)
+                outcome = "success"
+                return result
+            finally:
+                VECTOR_STORE_SECONDS.observe(
+                    time.perf_counter() - started, operation=operation, outcome=outcome
+                )
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def track_llm_request(provider: str):
+    """Time an LLM request and count it by provider and outcome"""
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "success"
+    finally:
+        LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, provider=provider, outcome=outcome)
+        LLM_REQUESTS.inc(provider=provider, outcome=outcome)
+
+
+def record_llm_tokens(provider: str, prompt_tokens: int, completion_tokens: int) -> None:
+    LLM_TOKENS.inc(prompt_tokens, provider=provider, direction="prompt")
+    LLM_TOKENS.inc(completion_tokens, provider=provider, direction="completion")
+
+
+def render_metrics() -> str:
+    return registry.render()
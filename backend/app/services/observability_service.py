@@ -1,17 +1,37 @@
 import logging
+import queue
+import random
+import threading
 from typing import Optional, List, Dict
 from datetime import datetime
-from langfuse import Langfuse
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 class ObservabilityService:
-    """Service for Langfuse observability"""
+    """Service for Langfuse observability.
+    
+    Events are sampled per type and put on a bounded in-process queue; a
+    background exporter thread sends them to Langfuse in batches. When the
+    queue is full the event is dropped rather than delaying the request.
+    """
     
     def __init__(self):
+        self.sample_rates = {
+            "cv_matching": settings.observability_sample_cv_matching,
+            "embedding_generation": settings.observability_sample_embedding,
+            "llm_call": settings.observability_sample_llm_call
+        }
+        self.batch_size = settings.observability_batch_size
+        self.flush_interval = settings.observability_flush_interval
+        self._queue: "queue.Queue" = queue.Queue(maxsize=settings.observability_queue_size)
+        self._stopped = threading.Event()
+        self._exporter = None
+        self.stats = {"enqueued": 0, "sampled_out": 0, "dropped": 0, "exported": 0, "export_errors": 0}
+        
         try:
             if settings.langfuse_public_key and settings.langfuse_secret_key:
+                from langfuse import Langfuse
                 self.client = Langfuse(
                     public_key=settings.langfuse_public_key,
                     secret_key=settings.langfuse_secret_key,
@@ -24,6 +44,59 @@ class ObservabilityService:
         except Exception as e:
             logger.warning(f"Failed to initialize Langfuse: {e}")
             self.client = None
+        
+        if self.client:
+            self._exporter = threading.Thread(
+                target=self._export_loop, name="observability-exporter", daemon=True
+            )
+            self._exporter.start()
+    
+    def _enqueue(self, event_type: str, **trace) -> None:
+        """Sample and queue a trace for the exporter; never blocks"""
+        if not self.client or self._stopped.is_set():
+            return
+        if random.random() >= self.sample_rates.get(event_type, 1.0):
+            self.stats["sampled_out"] += 1
+            return
+        try:
+            self._queue.put_nowait(trace)
+            self.stats["enqueued"] += 1
+        except queue.Full:
+            self.stats["dropped"] += 1
+    
+    def _export_loop(self) -> None:
+        """Drain the queue, sending traces in batches"""
+        while not self._stopped.is_set() or not self._queue.empty():
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._export(batch)
+    
+    def _export(self, batch: List) -> None:
+        waiters = []
+        for item in batch:
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+                continue
+            try:
+                self.client.trace(**item)
+                self.stats["exported"] += 1
+            except Exception as e:
+                self.stats["export_errors"] += 1
+                logger.error(f"Error logging to Langfuse: {e}")
+        try:
+            self.client.flush()
+        except Exception as e:
+            logger.error(f"Error flushing Langfuse: {e}")
+        for waiter in waiters:
+            waiter.set()
     
     def log_cv_matching(
         self,
@@ -33,38 +106,28 @@ class ObservabilityService:
         reasoning: str
     ) -> None:
         """Log CV matching event"""
-        if not self.client:
-            return
-        
-        try:
-            self.client.trace(
-                name="cv_matching",
-                user_id="system",
-                metadata={
-                    "cv_filename": cv_filename,
-                    "job_title": job_title,
-                    "match_score": match_score,
-                    "reasoning": reasoning
-                }
-            )
-        except Exception as e:
-            logger.error(f"Error logging to Langfuse: {e}")
+        self._enqueue(
+            "cv_matching",
+            name="cv_matching",
+            user_id="system",
+            metadata={
+                "cv_filename": cv_filename,
+                "job_title": job_title,
+                "match_score": match_score,
+                "reasoning": reasoning
+            }
+        )
     
     def log_embedding_generation(self, text_length: int, embedding_dim: int) -> None:
         """Log embedding generation event"""
-        if not self.client:
-            return
-        
-        try:
-            self.client.trace(
-                name="embedding_generation",
-                metadata={
-                    "text_length": text_length,
-                    "embedding_dimension": embedding_dim
-                }
-            )
-        except Exception as e:
-            logger.error(f"Error logging to Langfuse: {e}")
+        self._enqueue(
+            "embedding_generation",
+            name="embedding_generation",
+            metadata={
+                "text_length": text_length,
+                "embedding_dimension": embedding_dim
+            }
+        )
     
     def log_llm_call(
         self,
@@ -74,29 +137,39 @@ class ObservabilityService:
         provider: str
     ) -> None:
         """Log LLM call"""
-        if not self.client:
+        self._enqueue(
+            "llm_call",
+            name="llm_call",
+            metadata={
+                "model": model,
+                "provider": provider,
+                "prompt_length": len(prompt),
+                "response_length": len(response)
+            }
+        )
+    
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait until queued events have been exported"""
+        if not self._exporter or not self._exporter.is_alive():
             return
-        
+        done = threading.Event()
         try:
-            self.client.trace(
-                name="llm_call",
-                metadata={
-                    "model": model,
-                    "provider": provider,
-                    "prompt_length": len(prompt),
-                    "response_length": len(response)
-                }
-            )
-        except Exception as e:
-            logger.error(f"Error logging to Langfuse: {e}")
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            logger.warning("Observability queue full; flush timed out")
+            return
+        if not done.wait(timeout):
+            logger.warning("Timed out flushing observability events")
     
-    def flush(self) -> None:
-        """Flush pending events"""
-        if self.client:
-            try:
-                self.client.flush()
-            except Exception as e:
-                logger.error(f"Error flushing Langfuse: {e}")
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Flush pending events and stop the exporter"""
+        self.flush(timeout)
+        self._stopped.set()
+        if self._exporter:
+            self._exporter.join(timeout)
+    
+    def get_stats(self) -> Dict:
+        return {**self.stats, "queue_depth": self._queue.qsize()}
 
 # Global instance
 observability_service = None
@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from app.core.config import settings
+from app.services.metrics_service import SINGLE_FLIGHT_CALLS
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one computation.
+
+    The first caller for a key (the leader) runs the work; callers arriving
+    while it is in flight wait for the same result or exception instead of
+    repeating it. Nothing is kept once the work finishes, so this only
+    removes duplicate concurrent work; the embedding and LLM caches handle
+    repeats over time. Sync callers and async callers share in-flight work.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Content hash identifying a unit of work"""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                SINGLE_FLIGHT_CALLS.inc(flight=self.name, role="coalesced")
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            self.leaders += 1
+        SINGLE_FLIGHT_CALLS.inc(flight=self.name, role="leader")
+        return future, True
+
+    def _settle(self, key: str, future: Future, result: Any = None, error: BaseException = None) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+            if error is not None:
+                self.errors += 1
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn once for all concurrent callers with this key (blocking)"""
+        if not settings.single_flight_enabled:
+            return fn()
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self._settle(key, future, error=e)
+            raise
+        self._settle(key, future, result)
+        return result
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run the coroutine from fn once for all concurrent callers with this key.
+
+        The leader's work runs as its own task, so a caller that times out or
+        is cancelled does not cancel it for the others.
+        """
+        if not settings.single_flight_enabled:
+            return await fn()
+        future, leader = self._join(key)
+        if leader:
+            task = asyncio.ensure_future(fn())
+
+            def done(task: asyncio.Task) -> None:
+                if task.cancelled():
+                    self._settle(key, future, error=asyncio.CancelledError())
+                elif task.exception() is not None:
+                    self._settle(key, future, error=task.exception())
+                else:
+                    self._settle(key, future, task.result())
+
+            task.add_done_callback(done)
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def get_stats(self) -> Dict:
+        """Leader/coalesced counters and current in-flight keys"""
+        with self._lock:
+            calls = self.leaders + self.coalesced
+            return {
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "in_flight": len(self._inflight),
+                "coalesced_ratio": round(self.coalesced / calls, 4) if calls else 0.0
+            }
+
+# Global instances, one per kind of work
+_flights: Dict[str, SingleFlight] = {}
+_flights_lock = threading.Lock()
+
+def get_single_flight(name: str) -> SingleFlight:
+    with _flights_lock:
+        if name not in _flights:
+            _flights[name] = SingleFlight(name)
+        return _flights[name]
+
+def get_single_flight_stats() -> Dict[str, Dict]:
+    """Counters for every single-flight group"""
+    with _flights_lock:
+        flights = dict(_flights)
+    return {name: flight.get_stats() for name, flight in flights.items()}
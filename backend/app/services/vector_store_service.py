@@ -1,7 +1,8 @@
 import logging
-from typing import List, Optional
-from pinecone import Pinecone, ServerlessSpec
+from typing import Dict, List, Optional, Union
 from app.core.config import settings
+from app.services.metrics_service import timed_vector_store
+from app.services.local_vector_store import LocalVectorStoreService
 
 logger = logging.getLogger(__name__)
 
@@ -10,6 +11,7 @@ class VectorStoreService:
     
     def __init__(self):
         try:
+            from pinecone import Pinecone
             self.pc = Pinecone(api_key=settings.pinecone_api_key)
             self.index_name = settings.pinecone_index_name
             self.index = self._get_or_create_index()
@@ -26,6 +28,7 @@ class VectorStoreService:
             index_names = [idx.name for idx in indexes]
             
             if self.index_name not in index_names:
+                from pinecone import ServerlessSpec
                 logger.info(f"Creating index: {self.index_name}")
                 self.pc.create_index(
                     name=self.index_name,
@@ -42,6 +45,7 @@ class VectorStoreService:
             logger.error(f"Error creating/getting index: {e}")
             raise
     
+    @timed_vector_store("upsert")
     def upsert_vectors(self, vectors: List[tuple]) -> None:
         """
         Upsert vectors to Pinecone
@@ -54,6 +58,7 @@ class VectorStoreService:
             logger.error(f"Error upserting vectors: {e}")
             raise
     
+    @timed_vector_store("query")
     def query_similar(self, embedding: List[float], top_k: int = 5) -> List[dict]:
         """Query similar vectors"""
         try:
@@ -67,6 +72,21 @@ class VectorStoreService:
             logger.error(f"Error querying vectors: {e}")
             raise
     
+    @timed_vector_store("fetch")
+    def fetch_vectors(self, vector_ids: List[str]) -> Dict[str, List[float]]:
+        """Fetch stored vectors by ID (missing IDs are omitted)"""
+        try:
+            vectors = {}
+            for start in range(0, len(vector_ids), 1000):
+                results = self.index.fetch(ids=vector_ids[start:start + 1000])
+                for vector_id, vector in results.vectors.items():
+                    vectors[vector_id] = list(vector.values)
+            return vectors
+        except Exception as e:
+            logger.error(f"Error fetching vectors: {e}")
+            raise
+    
+    @timed_vector_store("delete")
     def delete_vector(self, vector_id: str) -> None:
         """Delete a vector by ID"""
         try:
@@ -88,8 +108,14 @@ class VectorStoreService:
 # Global instance
 vector_store_service = None
 
-def get_vector_store_service() -> VectorStoreService:
+def get_vector_store_service() -> Union[VectorStoreService, LocalVectorStoreService]:
     global vector_store_service
     if vector_store_service is None:
-        vector_store_service = VectorStoreService()
+        backend = settings.vector_store_backend.lower()
+        if backend == "pinecone":
+            vector_store_service = VectorStoreService()
+        elif backend == "local":
+            vector_store_service = LocalVectorStoreService(settings.local_index_path)
+        else:
+            raise ValueError(f"Unsupported vector store backend: {backend}")
     return vector_store_service
@@ -0,0 +1,343 @@
+"""Offline end-to-end benchmark for the CV upload and matching API.
+
+Runs the FastAPI app in-process with a deterministic fake LLM, the local
+vector store and a hashing embedder, so no API keys or network access are
+needed. For each CV count it uploads CVs through /api/cv/upload, then drives
+/api/matching/match at each concurrency level and records throughput, request
+latency and per-stage latency (graph nodes, vector store calls, LLM calls).
+
+Results are written as JSON, tagged with the git commit, and can be compared
+against an earlier run with --baseline.
+
+Usage (from backend/):
+    python -m benchmarks.run_benchmark --cv-counts 50 200 --concurrency 1 4 16
+    python -m benchmarks.run_benchmark --baseline benchmarks/results/<earlier>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.fakes import FakeChatModel, HashingEncoder  # noqa: E402
+
+SKILLS = [
+    "python", "java", "go", "rust", "typescript", "react", "django", "fastapi", "spring",
+    "kubernetes", "docker", "terraform", "aws", "gcp", "azure", "postgresql", "mongodb",
+    "redis", "kafka", "spark", "airflow", "pytorch", "tensorflow", "nlp", "llm", "graphql",
+    "grpc", "microservices", "ci/cd", "linux", "sql", "pandas", "scikit-learn", "tableau"
+]
+TITLES = [
+    "Backend Engineer", "Data Scientist", "ML Engineer", "Platform Engineer",
+    "Frontend Engineer", "Data Engineer", "DevOps Engineer", "Full Stack Developer"
+]
+
+
+def make_cv(index: int, seed: int) -> str:
+    """Synthetic CV with summary, experience, skills and education sections"""
+    rng = random.Random(seed * 100003 + index)
+    skills = rng.sample(SKILLS, 8)
+    title = rng.choice(TITLES)
+    lines = [
+        f"Candidate {index}",
+        "",
+        "Summary",
+        f"{title} with {rng.randint(1, 15)} years of experience in {', '.join(skills[:3])}.",
+        "",
+        "Experience"
+    ]
+    for job in range(rng.randint(2, 5)):
+        lines.append(f"{rng.choice(TITLES)} at Company {rng.randint(1, 500)} ({2010 + job * 2}-{2012 + job * 2})")
+        for _ in range(rng.randint(3, 6)):
+            a, b = rng.sample(skills, 2)
+            lines.append(f"- Built and operated {a} services integrated with {b}, improving throughput "
+                         f"by {rng.randint(5, 80)}% for {rng.randint(2, 40)} teams.")
+        lines.append("")
+    lines += ["Skills", ", ".join(skills), "", "Education",
+              f"BSc Computer Science, University {rng.randint(1, 50)}"]
+    return "\n".join(lines)
+
+
+def make_jd(index: int, seed: int) -> Dict[str, str]:
+    rng = random.Random(seed * 7919 + index)
+    skills = rng.sample(SKILLS, 5)
+    title = rng.choice(TITLES)
+    return {
+        "job_title": title,
+        "job_description": (
+            f"We are hiring a {title}. Required skills: {', '.join(skills)}. "
+            f"You will design, build and run production systems using {skills[0]} and {skills[1]}."
+        ),
+        "required_skills": skills
+    }
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99/mean in milliseconds"""
+    if not values:
+        return {"count": 0, "p50_ms": None, "p95_ms": None, "p99_ms": None, "mean_ms": None}
+    ms = np.asarray(values, dtype=np.float64) * 1000
+    return {
+        "count": len(values),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "mean_ms": round(float(ms.mean()), 3)
+    }
+
+
+class StageRecorder:
+    """Keeps raw samples from the app's latency histograms for exact percentiles"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def attach(self, histogram, prefix: str, label: str) -> None:
+        observe = histogram.observe
+
+        def recording_observe(value, **labels):
+            observe(value, **labels)
+            self.samples[f"{prefix}:{labels[label]}"].append(value)
+
+        histogram.observe = recording_observe
+
+    def take(self) -> Dict[str, Dict]:
+        summary = {name: percentiles(values) for name, values in sorted(self.samples.items())}
+        self.samples.clear()
+        return summary
+
+
+def configure(workdir: str, args) -> None:
+    """Point every service at local stand-ins before any singleton is created"""
+    from app.core.config import settings
+    settings.vector_store_backend = "local"
+    settings.local_index_path = os.path.join(workdir, "vector_index")
+    settings.document_store_path = os.path.join(workdir, "documents.db")
+    settings.match_job_store_path = os.path.join(workdir, "match_jobs.db")
+    settings.match_run_store_path = os.path.join(workdir, "match_runs.db")
+    settings.lexical_index_path = os.path.join(workdir, "lexical_index.db")
+    settings.embedding_cache_path = None
+    settings.llm_cache_enabled = args.llm_cache
+    settings.llm_cache_path = os.path.join(workdir, "llm_cache.db")
+    settings.incremental_matching = args.incremental
+    settings.llm_batch_scoring = args.batch_scoring
+    settings.llm_provider = "openai"
+    settings.langfuse_public_key = ""
+    settings.langfuse_secret_key = ""
+    if args.similarity_threshold is not None:
+        settings.similarity_threshold = args.similarity_threshold
+    settings.skill_filter_min_fraction = args.skill_filter
+
+    if not args.real_embeddings:
+        import app.services.embedding_service as embedding_module
+        embedding_module._load_model = (
+            lambda model_name: HashingEncoder(model_name, settings.embedding_dimension)
+        )
+
+    from app.services import register_llm_client
+    register_llm_client("openai", FakeChatModel(args.llm_latency_ms, args.llm_jitter_ms))
+
+
+async def run_requests(send, count: int, concurrency: int) -> Dict:
+    """Issue count requests with at most concurrency in flight"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], []
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            response = await send(i)
+            elapsed = time.perf_counter() - started
+            if response.status_code == 200:
+                latencies.append(elapsed)
+            else:
+                errors.append(f"{response.status_code}: {response.text[:200]}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    wall = time.perf_counter() - started
+    return {
+        "requests": count,
+        "errors": len(errors),
+        "error_samples": errors[:3],
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 3) if wall else None,
+        "latency": percentiles(latencies)
+    }
+
+
+async def run(args) -> Dict:
+    import httpx
+    from app.main import app
+    from app.services.metrics_service import LLM_REQUEST_SECONDS, STAGE_SECONDS, VECTOR_STORE_SECONDS
+
+    recorder = StageRecorder()
+    recorder.attach(STAGE_SECONDS, "stage", "stage")
+    recorder.attach(VECTOR_STORE_SECONDS, "vector_store", "operation")
+    recorder.attach(LLM_REQUEST_SECONDS, "llm", "provider")
+
+    scenarios = []
+    uploaded = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for cv_count in sorted(args.cv_counts):
+            # CV sets are cumulative: each count uploads only the CVs it adds
+            new_ids = list(range(uploaded, cv_count))
+
+            async def upload(i: int):
+                index = new_ids[i]
+                return await client.post(
+                    "/api/cv/upload",
+                    files={"file": (f"cv_{index}.txt", make_cv(index, args.seed).encode(), "text/plain")},
+                    data={"cv_id": f"cv_{index}"}
+                )
+
+            recorder.take()
+            result = await run_requests(upload, len(new_ids), args.upload_concurrency)
+            scenarios.append({
+                "phase": "upload",
+                "cv_count": cv_count,
+                "concurrency": args.upload_concurrency,
+                **result,
+                "stages": recorder.take()
+            })
+            print(f"upload  cvs={cv_count:<5} c={args.upload_concurrency:<3} "
+                  f"{result['throughput_rps']} req/s  p95={result['latency']['p95_ms']}ms")
+            uploaded = cv_count
+
+            cv_ids = [f"cv_{i}" for i in range(cv_count)]
+            for concurrency in args.concurrency:
+                async def match(i: int):
+                    jd = make_jd(i % args.jd_variants, args.seed)
+                    return await client.post("/api/matching/match", json={
+                        "jd": jd,
+                        "cv_ids": cv_ids,
+                        "llm_provider": "openai",
+                        "top_k": 10,
+                        "llm_top_m": args.llm_top_m
+                    })
+
+                recorder.take()
+                result = await run_requests(match, args.match_requests, concurrency)
+                result["cvs_per_second"] = (
+                    round(result["throughput_rps"] * cv_count, 3) if result["throughput_rps"] else None
+                )
+                stages = recorder.take()
+                result["llm_calls"] = sum(
+                    summary["count"] for name, summary in stages.items() if name.startswith("llm:")
+                )
+                scenarios.append({
+                    "phase": "match",
+                    "cv_count": cv_count,
+                    "concurrency": concurrency,
+                    **result,
+                    "stages": stages
+                })
+                print(f"match   cvs={cv_count:<5} c={concurrency:<3} "
+                      f"{result['throughput_rps']} req/s  p95={result['latency']['p95_ms']}ms  "
+                      f"llm_calls={result['llm_calls']}")
+
+    return {"scenarios": scenarios}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def compare(current: Dict, baseline: Dict) -> None:
+    """Print p95 latency and throughput deltas against a baseline run"""
+    def key(s):
+        return s["phase"], s["cv_count"], s["concurrency"]
+
+    previous = {key(s): s for s in baseline.get("scenarios", [])}
+    print(f"\nCompared with {baseline.get('meta', {}).get('git_commit')}:")
+    for scenario in current["scenarios"]:
+        old = previous.get(key(scenario))
+        if not old or not old["latency"]["p95_ms"] or not scenario["latency"]["p95_ms"]:
+            continue
+        p95 = (scenario["latency"]["p95_ms"] / old["latency"]["p95_ms"] - 1) * 100
+        rps = (scenario["throughput_rps"] / old["throughput_rps"] - 1) * 100 if old["throughput_rps"] else 0.0
+        print(f"{scenario['phase']:<7} cvs={scenario['cv_count']:<5} c={scenario['concurrency']:<3} "
+              f"p95 {p95:+.1f}%  throughput {rps:+.1f}%")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cv-counts", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--match-requests", type=int, default=20, help="match requests per scenario")
+    parser.add_argument("--upload-concurrency", type=int, default=8)
+    parser.add_argument("--jd-variants", type=int, default=5, help="distinct job descriptions cycled through")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--llm-top-m", type=int, default=None)
+    # Hashing-encoder similarities run lower than a real model's, so by default
+    # gate on llm_top_m only and let every scenario exercise the LLM path
+    parser.add_argument("--similarity-threshold", type=float, default=0.0)
+    # Synthetic CVs list only some of a JD's skills, so the skills filter is off
+    # by default; pass e.g. 0.5 to measure it
+    parser.add_argument("--skill-filter", type=float, default=0.0,
+                        help="skill_filter_min_fraction for required_skills (0 = off)")
+    parser.add_argument("--batch-scoring", action="store_true", help="enable batched LLM scoring")
+    parser.add_argument("--llm-cache", action="store_true", help="enable the LLM response cache")
+    parser.add_argument("--incremental", action="store_true", help="reuse saved match runs across requests")
+    parser.add_argument("--real-embeddings", action="store_true",
+                        help="load the configured sentence-transformers model instead of the hashing encoder")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default=None, help="JSON result path (default: benchmarks/results/)")
+    parser.add_argument("--baseline", default=None, help="earlier result JSON to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="cv-bench-") as workdir:
+        configure(workdir, args)
+        started = time.perf_counter()
+        results = asyncio.run(run(args))
+
+    commit = git_commit()
+    results["meta"] = {
+        "git_commit": commit,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "duration_s": round(time.perf_counter() - started, 3),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "args": vars(args)
+    }
+
+    output = args.output or os.path.join(
+        BACKEND_DIR, "benchmarks", "results",
+        f"bench-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{commit or 'nogit'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Compare local vector index storage layouts: memory per vector, recall and query latency.
+
+Builds an in-memory LocalVectorStoreService for each layout over the same
+synthetic, clustered corpus, then reports bytes per vector for the coarse
+search, recall@k against exact full-precision search (before and after the
+rerank) and query latency.
+
+Usage (from backend/):
+    python -m benchmarks.vector_index_benchmark --vectors 20000 --layouts float32 float16 int8 int8:128
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def make_corpus(count: int, dimension: int, clusters: int, seed: int) -> np.ndarray:
+    """Unit vectors drawn around random cluster centres (CV embeddings cluster by role)"""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(clusters, dimension)).astype(np.float32)
+    vectors = centres[rng.integers(0, clusters, count)] + rng.normal(0, 0.6, (count, dimension)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def run_layout(layout: str, corpus: np.ndarray, args) -> dict:
+    from app.core.config import settings
+    from app.services.local_vector_store import LocalVectorStoreService
+
+    precision, _, pca = layout.partition(":")
+    settings.local_index_precision = precision
+    settings.local_index_pca_dim = int(pca or 0)
+    settings.local_index_pca_min_vectors = min(settings.local_index_pca_min_vectors, len(corpus))
+    settings.local_index_rerank_factor = args.rerank_factor
+    settings.local_index_hnsw_threshold = args.hnsw_threshold
+
+    store = LocalVectorStoreService(path=None, dimension=corpus.shape[1])
+    started = time.perf_counter()
+    for start in range(0, len(corpus), 1000):
+        store.upsert_vectors([
+            (f"v{i}", corpus[i], {}) for i in range(start, min(start + 1000, len(corpus)))
+        ])
+    store.wait_for_graph()
+    build_s = time.perf_counter() - started
+
+    rng = np.random.default_rng(args.seed + 1)
+    queries = corpus[rng.choice(len(corpus), args.queries, replace=False)]
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        store.query_similar(query, top_k=args.top_k)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    return {
+        "layout": layout,
+        **store.get_stats(),
+        **store.measure_recall(sample_size=args.queries, top_k=args.top_k, seed=args.seed),
+        "build_s": round(build_s, 3),
+        "query_p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "query_p95_ms": round(float(np.percentile(latencies, 95)), 3)
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=20000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=50)
+    parser.add_argument("--layouts", nargs="+", default=["float32", "float16", "int8", "int8:128"],
+                        help="precision[:pca_dim], e.g. float16 or int8:128")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--rerank-factor", type=int, default=4)
+    parser.add_argument("--hnsw-threshold", type=int, default=10 ** 9, help="vectors before HNSW is used")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default=None, help="optional JSON result path")
+    args = parser.parse_args(argv)
+
+    corpus = make_corpus(args.vectors, args.dimension, args.clusters, args.seed)
+    results = [run_layout(layout, corpus, args) for layout in args.layouts]
+    for r in results:
+        print(f"{r['layout']:<12} {r['search_bytes_per_vector']:>5} B/vector ({r['compression_ratio']}x)  "
+              f"recall@{r['top_k']} coarse={r['recall_coarse']} reranked={r['recall']}  "
+              f"p50={r['query_p50_ms']}ms p95={r['query_p95_ms']}ms")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -52,8 +52,8 @@ with st.sidebar:
     # LLM Provider selection
     llm_provider = st.selectbox(
         "Select LLM Provider",
-        options=["openai", "claude", "grok"],
-        help="Choose the LLM for CV analysis"
+        options=["openai", "claude", "grok", "auto"],
+        help="Choose the LLM for CV analysis (auto picks the fastest healthy provider)"
     )
     
     # Top K results
@@ -174,24 +174,63 @@ with tab2:
         elif not st.session_state.uploaded_cvs:
             st.error("Please upload at least one CV first")
         else:
-            with st.spinner("🔄 Matching CVs..."):
-                required_skills = [s.strip() for s in required_skills_input.split(",")] if required_skills_input else None
-                
-                result = st.session_state.api_client.match_cvs(
-                    jd={
-                        "job_title": job_title,
-                        "job_description": job_description,
-                        "required_skills": required_skills
-                    },
-                    cv_ids=[cv["cv_id"] for cv in st.session_state.uploaded_cvs],
-                    llm_provider=llm_provider,
-                    top_k=top_k
-                )
-                
-                if "error" in result:
-                    st.error(f"Matching failed: {result['error']}")
+            required_skills = [s.strip() for s in required_skills_input.split(",")] if required_skills_input else None
+            
+            # Stream results and render them as each CV finishes
+            progress_bar = st.progress(0.0, text="🔄 Matching CVs...")
+            live_table = st.empty()
+            scored = []
+            result = None
+            
+            for frame in st.session_state.api_client.match_cvs_stream(
+                jd={
+                    "job_title": job_title,
+                    "job_description": job_description,
+                    "required_skills": required_skills
+                },
+                cv_ids=[cv["cv_id"] for cv in st.session_state.uploaded_cvs],
+                llm_provider=llm_provider,
+                top_k=top_k
+            ):
+                if frame.get("type") == "result":
+                    progress_bar.progress(
+                        frame["completed"] / max(frame["total"], 1),
+                        text=f"🔄 Scored {frame['completed']} of {frame['total']} CVs"
+                    )
+                    if frame.get("match"):
+                        scored.append(frame["match"])
+                        # Same order as the summary: LLM-scored CVs first, then by score
+                        scored.sort(key=lambda m: (
+                            not m.get("llm_scored", True), -m.get("match_score", 0), m.get("cv_id", "")
+                        ))
+                        live_table.dataframe(
+                            pd.DataFrame([
+                                {
+                                    "CV": m.get("filename"),
+                                    "Score": f"{m.get('match_score', 0):.1%}",
+                                    "Experience": m.get("experience_alignment")
+                                }
+                                for m in scored
+                            ]),
+                            use_container_width=True,
+                            hide_index=True
+                        )
+                elif frame.get("type") == "summary":
+                    result = frame
+                elif frame.get("type") == "error":
+                    result = {"error": frame.get("detail")}
+            
+            progress_bar.empty()
+            if result is None:
+                st.error("Matching failed: stream ended without a summary")
+            elif "error" in result:
+                st.error(f"Matching failed: {result['error']}")
+            else:
+                st.session_state.matching_results = result
+                reused = len(st.session_state.uploaded_cvs) - (result.get("cvs_scored") or 0)
+                if result.get("cvs_scored") is not None and reused > 0:
+                    st.success(f"✅ Matching completed! Scored {result['cvs_scored']} new or changed CVs, reused {reused} from the last run")
                 else:
-                    st.session_state.matching_results = result
                     st.success("✅ Matching completed!")
 
 # Tab 3: Results
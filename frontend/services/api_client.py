@@ -1,5 +1,6 @@
 import requests
-from typing import List, Dict, Optional
+import json
+from typing import List, Dict, Iterator, Optional
 import os
 
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8801")
@@ -44,6 +45,39 @@ class APIClient:
         except Exception as e:
             return {"error": str(e)}
     
+    def match_cvs_stream(
+        self,
+        jd: Dict,
+        cv_ids: List[str],
+        llm_provider: str = "openai",
+        top_k: int = 5
+    ) -> Iterator[Dict]:
+        """Match CVs against JD, yielding NDJSON frames as each CV finishes.
+        
+        Yields {"type": "result", ...} frames followed by one
+        {"type": "summary", ...} frame; failures are yielded as
+        {"type": "error", "detail": ...}.
+        """
+        try:
+            payload = {
+                "jd": jd,
+                "cv_ids": cv_ids,
+                "llm_provider": llm_provider,
+                "top_k": top_k
+            }
+            with requests.post(
+                f"{self.base_url}/api/matching/match/stream",
+                json=payload,
+                stream=True,
+                timeout=(10, 300)  # (connect, per-read) so long batches don't time out
+            ) as response:
+                response.raise_for_status()
+                for line in response.iter_lines(decode_unicode=True):
+                    if line:
+                        yield json.loads(line)
+        except Exception as e:
+            yield {"type": "error", "detail": str(e)}
+    
     def get_embedding(self, text: str) -> Dict:
         """Get embedding for text"""
         try: